@@ -221,10 +221,11 @@ def stage6(video_path: Path, output: Path, language: str):
 def process(video_path: Path, output: Path, language: str):
     """完整流程: 执行所有 7 个阶段."""
     import time
+    from concurrent.futures import ThreadPoolExecutor
     from datetime import datetime
     
     from video2markdown.stage1_analyze import analyze_video
-    from video2markdown.stage2_transcribe import transcribe_video
+    from video2markdown.stage2_transcribe import optimize_transcript, transcribe_video
     from video2markdown.stage3_keyframes import extract_candidate_frames
     from video2markdown.stage4_filter import filter_keyframes
     from video2markdown.stage5_analyze_images import analyze_images
@@ -267,37 +268,60 @@ def process(video_path: Path, output: Path, language: str):
     stats.summary.completed_stages = 1
     click.echo()
     
-    # Stage 2
+    # Stage 2 (2a/2b)
     click.echo("=" * 50)
     stats.summary.start_stage("stage2_transcribe")
-    transcript = transcribe_video(video_path, video_info, model_path, temp_dir=temp_dir)
+    transcript = transcribe_video(
+        video_path, video_info, model_path, temp_dir=temp_dir, optimize=False
+    )
     stats.summary.end_stage("stage2_transcribe")
     stats.summary.completed_stages = 2
     click.echo()
     
-    # Stage 3
-    click.echo("=" * 50)
-    stats.summary.start_stage("stage3_keyframes")
-    candidates = extract_candidate_frames(video_path, video_info)
-    stats.summary.end_stage("stage3_keyframes")
-    stats.summary.completed_stages = 3
-    click.echo()
-    
-    # Stage 4
-    click.echo("=" * 50)
-    stats.summary.start_stage("stage4_filter")
-    keyframes = filter_keyframes(video_path, candidates, transcript)
-    stats.summary.end_stage("stage4_filter")
-    stats.summary.completed_stages = 4
-    click.echo()
-    
-    # Stage 5
-    click.echo("=" * 50)
-    stats.summary.start_stage("stage5_analyze_images")
-    frames_dir = temp_dir / "images"
-    descriptions = analyze_images(video_path, keyframes, transcript, frames_dir)
-    stats.summary.end_stage("stage5_analyze_images")
-    stats.summary.completed_stages = 5
+    # Stage 2c: 文稿优化只有 Stage 6 使用（Stage 3-5 只需原始转录片段），
+    # 在后台调用 AI，与 Stage 3-5 并行
+    def run_optimize() -> str:
+        try:
+            return optimize_transcript(transcript.segments, video_path.stem, settings.output_language)
+        finally:
+            stats.summary.end_stage("stage2c_optimize")
+    
+    stats.summary.start_stage("stage2c_optimize")
+    optimize_executor = ThreadPoolExecutor(max_workers=1)
+    try:
+        optimize_future = optimize_executor.submit(run_optimize)
+        
+        # Stage 3
+        click.echo("=" * 50)
+        stats.summary.start_stage("stage3_keyframes")
+        candidates = extract_candidate_frames(video_path, video_info)
+        stats.summary.end_stage("stage3_keyframes")
+        stats.summary.completed_stages = 3
+        click.echo()
+        
+        # Stage 4
+        click.echo("=" * 50)
+        stats.summary.start_stage("stage4_filter")
+        keyframes = filter_keyframes(video_path, candidates, transcript)
+        stats.summary.end_stage("stage4_filter")
+        stats.summary.completed_stages = 4
+        click.echo()
+        
+        # Stage 5
+        click.echo("=" * 50)
+        stats.summary.start_stage("stage5_analyze_images")
+        frames_dir = temp_dir / "images"
+        descriptions = analyze_images(video_path, keyframes, transcript, frames_dir)
+        stats.summary.end_stage("stage5_analyze_images")
+        stats.summary.completed_stages = 5
+        click.echo()
+        
+        # 等待后台的 Stage 2c 完成
+        transcript.optimized_text = optimize_future.result()
+    finally:
+        # 前面的阶段出错时不等待后台的 AI 调用结束 (正常流程中此时已完成)
+        optimize_executor.shutdown(wait=False, cancel_futures=True)
+    click.echo(f"  ✓ M1 文稿优化完成: {len(transcript.optimized_text)} 字符")
     click.echo()
     
     # Stage 6
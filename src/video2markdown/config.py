@@ -59,16 +59,36 @@ class Settings(BaseSettings):
 
     # 并发配置
     api_max_concurrency: int = Field(default=5, description="LLM API 最大并发数")
-    image_max_concurrency: int = Field(default=3, description="图片分析并发数")
+    api_http2: bool = Field(default=False, description="API 请求使用 HTTP/2 多路复用 (需安装 httpx[http2])")
+    image_max_concurrency: int = Field(default=0, description="图片分析并发数 (0 为与 API 并发数相同)")
+    vision_batch_size: int = Field(default=1, description="单次请求分析的图片数 (>1 时多图合并为一次请求)")
+    vision_batch_api: bool = Field(default=False, description="通过 Batch API 异步提交图片分析 (费用更低，耗时取决于服务端排队，最长 24 小时)")
+    vision_image_detail: str = Field(default="", description="图片 detail 档位: low/high/auto (留空不发送；low 可大幅减少图片 token，需模型支持)")
+    vision_image_url_prefix: str = Field(default="", description="帧图片目录的公网 URL 前缀 (设置后以 URL 引用图片，不再内嵌 base64)")
+    dedup_hamming_threshold: int = Field(default=0, description="关键帧感知哈希去重阈值 (汉明距离，0 为关闭，建议 5)")
+    dedup_hash: str = Field(default="phash", description="去重使用的感知哈希: phash (DCT，抗亮度变化) 或 dhash (梯度，更快)")
+    
+    # 视频解码
+    decode_threads: int = Field(default=0, description="单个视频解码器的线程数 (0 为 FFmpeg 自动)")
+    hw_decode: bool = Field(default=False, description="优先使用硬件解码 (VAAPI/NVDEC 等)，不可用时回退软件解码")
+    frame_workers: int = Field(default=0, description="Stage 4 并行读帧检测的线程数 (0 为按 CPU 核数，最多 4)")
+    text_detect_width: int = Field(default=0, description="Stage 4 文字检测前将帧缩小到的宽度 (0 为原分辨率，建议 960)")
+    text_detect_otsu: bool = Field(default=False, description="Stage 4 文字检测的 Canny 阈值按 Otsu 自适应 (默认固定 50/150)")
+    
+    # 结果缓存
+    llm_cache: bool = Field(default=False, description="缓存 LLM 响应，相同请求重跑时直接复用 (调试用)")
+    analysis_cache: bool = Field(default=False, description="缓存 Stage 1 视频分析与 Stage 4 文字检测结果，同一视频再次运行时跳过场景检测与逐帧解码")
     
     # 处理参数
     keyframe_interval: float = Field(default=30.0)
+    keyframe_format: str = Field(default="jpg", description="关键帧原图格式: jpg (质量 95) 或 webp (无损)")
     scene_threshold: float = Field(default=0.3)
     
     # 路径
     output_dir: Path = Field(default=PROJECT_ROOT / "test_outputs" / "results")
     temp_dir: Path = Field(default=PROJECT_ROOT / "test_outputs" / "temp")
     prompts_dir: Path = Field(default=PROJECT_ROOT / "prompts")
+    stage7_frame_mode: str = Field(default="copy", description="配图放入成果目录的方式: copy / link (硬链接，与临时目录共用同一文件) / reflink / move")
 
     # LLM API 定价（单位：元/百万 tokens）
     llm_price_input_per_1m: float = Field(default=4.8, description="输入 token 价格（元/百万）")
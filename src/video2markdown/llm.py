@@ -0,0 +1,84 @@
+"""LLM API 调用的共享资源.
+
+各阶段共用同一个并发名额池：Stage 2c 与 Stage 3-5 并行后，多个阶段可能
+同时发起请求，总在途请求数仍受 settings.api_max_concurrency 限制。
+
+各阶段也共用同一个 OpenAI 客户端 (及其 HTTP 连接池)，避免每个阶段重新
+建立 TLS 连接。
+"""
+
+import importlib.util
+import threading
+from contextlib import contextmanager
+from typing import TYPE_CHECKING, Iterator, Optional
+
+if TYPE_CHECKING:
+    from openai import OpenAI
+
+_slots: Optional[threading.BoundedSemaphore] = None
+_slots_lock = threading.Lock()
+
+_client: Optional["OpenAI"] = None
+_client_lock = threading.Lock()
+
+
+def _get_slots() -> threading.BoundedSemaphore:
+    """延迟创建并发名额池 (首次调用时读取配置)."""
+    global _slots
+    if _slots is None:
+        with _slots_lock:
+            if _slots is None:
+                from video2markdown.config import settings
+                _slots = threading.BoundedSemaphore(max(1, settings.api_max_concurrency))
+    return _slots
+
+
+@contextmanager
+def api_slot() -> Iterator[None]:
+    """占用一个 API 并发名额，无空闲名额时阻塞等待.
+    
+    用法:
+        with api_slot():
+            response = client.chat.completions.create(...)
+    """
+    slots = _get_slots()
+    slots.acquire()
+    try:
+        yield
+    finally:
+        slots.release()
+
+
+def get_client(timeout: Optional[float] = None) -> "OpenAI":
+    """获取共享的 OpenAI 客户端 (首次调用时创建).
+    
+    Args:
+        timeout: 请求超时时间（秒），None 使用默认值。
+            指定时返回共享同一连接池的派生客户端。
+    """
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                import httpx
+                from openai import DefaultHttpxClient, OpenAI
+                from video2markdown.config import settings
+                
+                # 连接池上限跟随 API 并发数，保证并发请求都能复用连接；
+                # 空闲连接保留 60 秒 (默认 5 秒)，阶段之间的间隙不必重新握手
+                pool_size = max(1, settings.api_max_concurrency)
+                http2 = settings.api_http2 and importlib.util.find_spec("h2") is not None
+                if settings.api_http2 and not http2:
+                    print("  ⚠️  未安装 h2，API 请求使用 HTTP/1.1 (pip install 'httpx[http2]')")
+                http_client = DefaultHttpxClient(
+                    limits=httpx.Limits(
+                        max_connections=pool_size * 2,
+                        max_keepalive_connections=pool_size,
+                        keepalive_expiry=60.0,
+                    ),
+                    http2=http2,
+                )
+                _client = OpenAI(**settings.get_client_kwargs(), http_client=http_client)
+    if timeout is not None:
+        return _client.with_options(timeout=timeout)
+    return _client
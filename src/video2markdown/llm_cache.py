@@ -0,0 +1,61 @@
+"""LLM 响应磁盘缓存.
+
+相同请求 (模型 + 消息 + API 参数) 直接复用上次的响应文本，
+用于同一视频反复调试/重跑时跳过 API 调用。
+"""
+
+import hashlib
+from pathlib import Path
+from typing import Optional, Protocol
+
+import orjson
+
+from video2markdown.config import settings
+
+
+class CacheBackend(Protocol):
+    """缓存后端接口."""
+    
+    def get(self, key: str) -> Optional[dict]:
+        ...
+    
+    def set(self, key: str, value: dict) -> None:
+        ...
+
+
+class FileCacheBackend:
+    """文件缓存后端: 每个请求一个 JSON 文件."""
+    
+    def __init__(self, cache_dir: Path):
+        self.cache_dir = cache_dir
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+    
+    def get(self, key: str) -> Optional[dict]:
+        path = self.cache_dir / f"{key}.json"
+        try:
+            return orjson.loads(path.read_bytes())
+        except (OSError, orjson.JSONDecodeError):
+            return None
+    
+    def set(self, key: str, value: dict) -> None:
+        # 先写临时文件再替换，避免中断时留下不完整的缓存
+        path = self.cache_dir / f"{key}.json"
+        tmp_path = path.with_suffix(".tmp")
+        tmp_path.write_bytes(orjson.dumps(value))
+        tmp_path.replace(path)
+
+
+def make_cache_key(model: str, messages: list[dict], params: dict) -> str:
+    """请求内容的 SHA256 (键排序，与字典顺序无关)."""
+    payload = orjson.dumps(
+        {"model": model, "messages": messages, "params": params},
+        option=orjson.OPT_SORT_KEYS,
+    )
+    return hashlib.sha256(payload).hexdigest()
+
+
+def get_llm_cache() -> Optional[CacheBackend]:
+    """获取响应缓存，未启用 (settings.llm_cache) 时返回 None."""
+    if not settings.llm_cache:
+        return None
+    return FileCacheBackend(settings.temp_dir / "cache" / "llm")
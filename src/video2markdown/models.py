@@ -6,6 +6,8 @@
     M3: ImageDescriptions - 配图说明 (Stage 5 输出)
 """
 
+import bisect
+import itertools
 from dataclasses import dataclass, field
 from pathlib import Path
 from typing import Optional
@@ -36,9 +38,9 @@ class TranscriptSegment:
     
     def to_srt_time(self, seconds: float) -> str:
         """转换为 SRT 时间格式 HH:MM:SS,mmm."""
-        hours = int(seconds // 3600)
-        minutes = int((seconds % 3600) // 60)
-        secs = int(seconds % 60)
+        # 时分秒在整数上 divmod，只有毫秒需要浮点运算
+        minutes, secs = divmod(int(seconds), 60)
+        hours, minutes = divmod(minutes, 60)
         millis = int((seconds % 1) * 1000)
         return f"{hours:02d}:{minutes:02d}:{secs:02d},{millis:03d}"
     
@@ -114,11 +116,38 @@ class VideoTranscript:
     
     def get_text_around(self, timestamp: float, window: float = 10.0) -> str:
         """获取指定时间点前后的文本."""
-        relevant = []
-        for seg in self.segments:
-            if seg.start <= timestamp + window and seg.end >= timestamp - window:
-                relevant.append(seg.text)
-        return " ".join(relevant)
+        return self.get_texts_around([timestamp], window)[0]
+    
+    def get_texts_around(self, timestamps: list[float], window: float = 10.0) -> list[str]:
+        """批量获取多个时间点前后的文本.
+        
+        时间索引在每次调用时按当前片段重新建立 (不跨调用缓存，片段被修改后结果仍正确)。
+        片段按开始时间有序时每个时间点二分定位窗口，共 O(N + Q log N)；
+        无序时退化为逐段扫描。
+        """
+        segments = self.segments
+        starts = [seg.start for seg in segments]
+        if any(a > b for a, b in zip(starts, starts[1:])):
+            return [
+                " ".join(
+                    seg.text for seg in segments
+                    if seg.start <= t + window and seg.end >= t - window
+                )
+                for t in timestamps
+            ]
+        
+        # 开始时间不晚于窗口末尾的片段是一个前缀；
+        # 结束时间的前缀最大值单调，首个可能与窗口相交的片段之前全部可跳过
+        max_ends = list(itertools.accumulate((seg.end for seg in segments), max))
+        texts = []
+        for t in timestamps:
+            hi = bisect.bisect_right(starts, t + window)
+            lo = bisect.bisect_left(max_ends, t - window, 0, hi)
+            texts.append(" ".join(
+                seg.text for seg in segments[lo:hi]
+                if seg.end >= t - window
+            ))
+        return texts
 
 
 @dataclass
@@ -159,6 +188,19 @@ class ImageDescriptions:
     """M3: 配图说明 (Stage 5 输出)."""
     descriptions: list[ImageDescription]
     
+    def to_llm_images_json(self) -> str:
+        """序列化为 Stage 6 prompt 使用的配图 JSON (一次遍历)."""
+        import orjson
+        
+        return orjson.dumps([
+            {
+                "timestamp": d.timestamp,
+                "description": d.description,
+                "key_elements": d.key_elements,
+            }
+            for d in self.descriptions
+        ]).decode("utf-8")
+    
     def get_by_timestamp(self, timestamp: float, tolerance: float = 1.0) -> Optional[ImageDescription]:
         """根据时间戳查找描述."""
         for desc in self.descriptions:
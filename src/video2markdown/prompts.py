@@ -0,0 +1,53 @@
+"""Prompt 模板加载.
+
+prompts/*.md 由可选的 YAML frontmatter (system / parameters) 与模板正文组成，
+Stage 2/5/6 共用同一份解析与缓存。
+"""
+
+import functools
+import re
+from pathlib import Path
+
+# prompt 文件的 YAML frontmatter: 仅匹配文件开头、独占一行的 --- 分隔符
+_FRONTMATTER_RE = re.compile(r"\A---[ \t]*\n(.*?)^---[ \t]*$\n?(.*)\Z", re.DOTALL | re.MULTILINE)
+
+
+def load_prompt_with_meta(
+    template_path: Path,
+    default_system: str = "你是一位专业的视频内容分析师。",
+):
+    """加载 prompt 模板，返回 (system_msg, user_template, api_params).
+    
+    解析结果按 (路径, 修改时间) 缓存，文件修改后自动重新加载。
+    frontmatter 未配置 system 时使用 default_system。
+    """
+    system_msg, user_template, api_params = _load_prompt_cached(
+        str(template_path), template_path.stat().st_mtime_ns
+    )
+    # 副本，调用方可安全修改
+    return system_msg or default_system, user_template, dict(api_params)
+
+
+@functools.lru_cache(maxsize=16)
+def _load_prompt_cached(template_path: str, mtime_ns: int):
+    """解析 prompt 文件 (mtime_ns 仅作为缓存键)."""
+    content = Path(template_path).read_text(encoding="utf-8")
+    
+    # 无 frontmatter: 全文即模板，跳过正则与 YAML 解析
+    if not content.startswith("---"):
+        return None, content.strip(), {}
+    
+    # 解析 YAML frontmatter (优先使用 libyaml 的 C 实现)
+    import yaml
+    
+    match = _FRONTMATTER_RE.match(content)
+    if match is None:
+        raise ValueError(f"Prompt 文件 frontmatter 未闭合: {template_path}")
+    frontmatter, body = match.groups()
+    metadata = yaml.load(frontmatter, Loader=getattr(yaml, "CSafeLoader", yaml.SafeLoader))
+    
+    system_msg = metadata.get("system")
+    api_params = metadata.get("parameters", {})
+    user_template = body.strip()
+    
+    return system_msg, user_template, api_params
@@ -18,6 +18,10 @@ import cv2
 import numpy as np
 
 from video2markdown.models import VideoInfo
+from video2markdown.video_io import open_capture, read_frame_at
+
+# Stage 1 磁盘缓存格式版本（分析算法或输出结构变化时递增，使旧缓存失效）
+_ANALYSIS_CACHE_VERSION = 1
 
 
 def analyze_video(video_path: Path) -> VideoInfo:
@@ -38,6 +42,14 @@ def analyze_video(video_path: Path) -> VideoInfo:
     
     print(f"[Stage 1] 分析视频: {video_path.name}")
     
+    # 磁盘缓存（跨进程复用，分阶段命令每次都会重新运行 Stage 1）
+    cache = _get_analysis_cache()
+    cache_key = _analysis_cache_key(video_path) if cache else ""
+    cached = cache.get(cache_key) if cache else None
+    if cached is not None:
+        print(f"  📦 命中分析缓存，跳过场景检测 ({cache_key[:12]})")
+        return _video_info_from_dict(video_path, cached)
+    
     # 使用 ffprobe 获取视频元数据
     info, is_audio_only = _get_video_metadata(video_path)
     
@@ -66,11 +78,91 @@ def analyze_video(video_path: Path) -> VideoInfo:
         print(f"  ✓ 稳定区间: {len(stable_intervals)} 段 (总 {_total_duration(stable_intervals):.1f}s)")
         print(f"  ✓ 不稳定区间: {len(unstable_intervals)} 段 (总 {_total_duration(unstable_intervals):.1f}s)")
     
+    if cache:
+        cache.set(cache_key, _video_info_to_dict(info))
+    
     return info
 
 
+def _get_analysis_cache():
+    """获取 Stage 1 结果缓存，未启用时返回 None."""
+    from video2markdown.config import settings
+    from video2markdown.llm_cache import FileCacheBackend
+    
+    if not settings.analysis_cache:
+        return None
+    return FileCacheBackend(settings.temp_dir / "cache" / "stage1")
+
+
+def _analysis_cache_key(video_path: Path) -> str:
+    """缓存键: 文件路径 + 大小 + 修改时间 + 分析逻辑版本."""
+    import hashlib
+    
+    st = video_path.stat()
+    raw = f"{_ANALYSIS_CACHE_VERSION}|{video_path.resolve()}|{st.st_size}|{st.st_mtime_ns}"
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def _video_info_to_dict(info: VideoInfo) -> dict:
+    return {
+        "duration": info.duration,
+        "width": info.width,
+        "height": info.height,
+        "fps": info.fps,
+        "audio_codec": info.audio_codec,
+        "video_codec": info.video_codec,
+        "scene_changes": info.scene_changes,
+        "stable_intervals": info.stable_intervals,
+        "unstable_intervals": info.unstable_intervals,
+    }
+
+
+def _video_info_from_dict(video_path: Path, data: dict) -> VideoInfo:
+    return VideoInfo(
+        path=video_path,
+        duration=data["duration"],
+        width=data["width"],
+        height=data["height"],
+        fps=data["fps"],
+        audio_codec=data["audio_codec"],
+        video_codec=data["video_codec"],
+        scene_changes=data["scene_changes"],
+        stable_intervals=[tuple(iv) for iv in data["stable_intervals"]],
+        unstable_intervals=[tuple(iv) for iv in data["unstable_intervals"]],
+    )
+
+
+# ffprobe 结果缓存: (路径, 修改时间, 文件大小) -> (duration, width, height, fps, is_audio_only)
+# 同一进程内多次分析同一文件时不再重复启动 ffprobe，文件变化后自动失效
+_metadata_cache: dict[tuple[str, int, int], tuple[float, int, int, float, bool]] = {}
+
+
 def _get_video_metadata(video_path: Path) -> tuple[VideoInfo, bool]:
-    """使用 ffprobe 获取视频/音频元数据."""
+    """使用 ffprobe 获取视频/音频元数据 (按文件缓存)."""
+    st = video_path.stat()
+    key = (str(video_path.resolve()), st.st_mtime_ns, st.st_size)
+    meta = _metadata_cache.get(key)
+    if meta is None:
+        meta = _metadata_cache[key] = _probe_metadata(video_path)
+    duration, width, height, fps, is_audio_only = meta
+    
+    # 每次返回新的 VideoInfo，调用方会填充场景信息
+    return VideoInfo(
+        path=video_path,
+        duration=duration,
+        width=width,
+        height=height,
+        fps=fps,
+        audio_codec="unknown",
+        video_codec="unknown" if not is_audio_only else "audio_only",
+        scene_changes=[],
+        stable_intervals=[],
+        unstable_intervals=[]
+    ), is_audio_only
+
+
+def _probe_metadata(video_path: Path) -> tuple[float, int, int, float, bool]:
+    """运行 ffprobe，返回 (duration, width, height, fps, is_audio_only)."""
     # 首先获取格式信息（时长等）
     cmd_format = [
         "ffprobe", "-v", "error",
@@ -118,18 +210,7 @@ def _get_video_metadata(video_path: Path) -> tuple[VideoInfo, bool]:
             
             is_audio_only = False
     
-    return VideoInfo(
-        path=video_path,
-        duration=duration,
-        width=width,
-        height=height,
-        fps=fps,
-        audio_codec="unknown",
-        video_codec="unknown" if not is_audio_only else "audio_only",
-        scene_changes=[],
-        stable_intervals=[],
-        unstable_intervals=[]
-    ), is_audio_only
+    return duration, width, height, fps, is_audio_only
 
 
 def _analyze_video_stability(
@@ -156,23 +237,30 @@ def _analyze_video_stability(
     """
     from video2markdown.progress import HeartbeatMonitor
     
-    cap = cv2.VideoCapture(str(video_path))
+    cap = open_capture(video_path)
     if not cap.isOpened():
         raise RuntimeError(f"无法打开视频: {video_path}")
     
     fps = cap.get(cv2.CAP_PROP_FPS)
     total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
     
+    # 预分配解码缓冲区：读出的帧立即转灰度缩小，整个分析过程复用同一块内存
+    width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+    height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+    frame_buf = np.empty((height, width, 3), dtype=np.uint8)
+    
     # 第一步：粗粒度检测，找出变化点
     print(f"    第一步: 粗粒度检测...")
-    rough_changes = _detect_rough_changes(cap, fps, total_frames)
+    rough_changes = _detect_rough_changes(cap, fps, total_frames, frame_buf)
     
     # 第二步：精确化每个变化点的边界
     print(f"    第二步: 精确化 {len(rough_changes)} 个变化点边界...")
     precise_intervals = []
     with HeartbeatMonitor("精确化边界", interval=5):
         for i, change_ts in enumerate(rough_changes):
-            start, end = _precise_change_boundary(cap, fps, change_ts, stability_threshold)
+            start, end = _precise_change_boundary(
+                cap, change_ts, stability_threshold, frame_buf=frame_buf
+            )
             precise_intervals.append((start, end))
             if (i + 1) % 5 == 0 or i == len(rough_changes) - 1:
                 print(f"      已处理 {i+1}/{len(rough_changes)} 个变化点")
@@ -191,7 +279,12 @@ def _analyze_video_stability(
     return scene_changes, stable_intervals, unstable_intervals
 
 
-def _detect_rough_changes(cap: cv2.VideoCapture, fps: float, total_frames: int) -> list[float]:
+def _detect_rough_changes(
+    cap: cv2.VideoCapture,
+    fps: float,
+    total_frames: int,
+    frame_buf: Optional[np.ndarray] = None,
+) -> list[float]:
     """粗粒度检测变化点（每秒采样）."""
     changes = []
     prev_frame = None
@@ -199,13 +292,13 @@ def _detect_rough_changes(cap: cv2.VideoCapture, fps: float, total_frames: int)
     
     for frame_idx in range(0, total_frames, int(fps)):  # 每秒一帧
         cap.set(cv2.CAP_PROP_POS_FRAMES, frame_idx)
-        ret, frame = cap.read()
+        ret, frame = cap.read(frame_buf)
         if not ret:
             break
         
         timestamp = frame_idx / fps
-        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-        gray = cv2.resize(gray, (320, 180))  # 缩小加速
+        # 先缩小再转灰度，颜色转换只处理缩略图
+        gray = cv2.cvtColor(cv2.resize(frame, (320, 180)), cv2.COLOR_BGR2GRAY)
         
         if prev_frame is not None:
             diff = _frame_diff_fast(prev_frame, gray)
@@ -226,10 +319,10 @@ def _detect_rough_changes(cap: cv2.VideoCapture, fps: float, total_frames: int)
 
 def _precise_change_boundary(
     cap: cv2.VideoCapture,
-    fps: float,
     rough_ts: float,
     threshold: float,
-    search_window: float = 2.0
+    search_window: float = 2.0,
+    frame_buf: Optional[np.ndarray] = None,
 ) -> Tuple[float, float]:
     """用二分法精确化场景变化的边界.
     
@@ -241,13 +334,14 @@ def _precise_change_boundary(
     search_end = rough_ts + search_window
     
     # 采样更多帧进行精确分析
+    # 只在窗口起点 seek 一次，之后按 100ms 步长顺序向前读取
     samples = []
     ts = search_start
     while ts <= search_end:
-        frame = _read_frame_at(cap, ts, fps)
+        frame = read_frame_at(cap, ts, frame_buf)
         if frame is not None:
-            gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-            gray = cv2.resize(gray, (160, 90))  # 更小尺寸快速比较
+            # 先缩小到更小尺寸再转灰度，快速比较
+            gray = cv2.cvtColor(cv2.resize(frame, (160, 90)), cv2.COLOR_BGR2GRAY)
             samples.append((ts, gray))
         ts += 0.1  # 100ms 步长
     
@@ -255,15 +349,18 @@ def _precise_change_boundary(
         return (rough_ts - 0.5, rough_ts + 0.5)
     
     # 计算每帧的稳定性（与相邻帧的差异）
+    # 相邻帧差异只算一次：diffs[i] 同时是第 i 帧的 next 与第 i+1 帧的 prev
+    diffs = [
+        _frame_diff_fast(samples[i][1], samples[i+1][1])
+        for i in range(len(samples) - 1)
+    ]
     stability = []
-    for i, (ts, frame) in enumerate(samples):
+    for i, (ts, _) in enumerate(samples):
         if i == 0 or i == len(samples) - 1:
             stability.append((ts, float('inf')))
             continue
         
-        diff_prev = _frame_diff_fast(samples[i-1][1], frame)
-        diff_next = _frame_diff_fast(frame, samples[i+1][1])
-        avg_diff = (diff_prev + diff_next) / 2
+        avg_diff = (diffs[i-1] + diffs[i]) / 2
         stability.append((ts, avg_diff))
     
     # 找到不稳定区间的起点和终点
@@ -324,18 +421,12 @@ def _build_intervals(
     return (stable_intervals, [(s, e) for s, e in merged_unstable])
 
 
-def _read_frame_at(cap: cv2.VideoCapture, timestamp: float, fps: float) -> Optional[np.ndarray]:
-    """在指定时间戳读取帧."""
-    frame_idx = int(timestamp * fps)
-    cap.set(cv2.CAP_PROP_POS_FRAMES, frame_idx)
-    ret, frame = cap.read()
-    return frame if ret else None
-
-
 def _frame_diff_fast(frame1: np.ndarray, frame2: np.ndarray) -> float:
-    """快速计算两帧差异（用于粗粒度检测）."""
-    diff = cv2.absdiff(frame1, frame2)
-    return np.mean(diff)
+    """快速计算两帧差异（用于粗粒度检测）.
+    
+    平均绝对差 = L1 范数 / 像素数，cv2.norm 一次扫描完成，不生成差值图。
+    """
+    return cv2.norm(frame1, frame2, cv2.NORM_L1) / frame1.size
 
 
 def _total_duration(intervals: list[Tuple[float, float]]) -> float:
@@ -9,15 +9,18 @@
 输出: VideoTranscript (M1) + SRT (原始转录，参考用)
 """
 
-import json
+import os
 import subprocess
+from collections import deque
 from pathlib import Path
 from typing import Optional
 
-from openai import OpenAI
+import orjson
 
 from video2markdown.config import settings
+from video2markdown.llm import api_slot, get_client
 from video2markdown.models import TranscriptSegment, VideoInfo, VideoTranscript
+from video2markdown.prompts import load_prompt_with_meta
 
 
 def extract_audio(video_path: Path, output_path: Path) -> Path:
@@ -68,38 +71,50 @@ def transcribe_audio(
     print(f"    ⏳ Whisper 转录中，这可能需要几分钟...")
     
     # 使用心跳监控长时间运行的 whisper 进程
+    # 转录结果写入 JSON 文件，stdout 的逐段输出丢弃；
+    # stderr 边运行边逐行读取，只保留末尾若干行用于报错，内存占用恒定
     with HeartbeatMonitor("Whisper转录", interval=10):
-        result = subprocess.run(cmd, capture_output=True, text=True)
+        proc = subprocess.Popen(
+            cmd,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.PIPE,
+            text=True,
+            errors="replace",
+        )
+        stderr_tail = deque(proc.stderr, maxlen=50)
+        returncode = proc.wait()
     
-    if result.returncode != 0:
-        print(f"  错误: {result.stderr}")
-        raise RuntimeError(f"whisper-cli 失败: {result.returncode}")
+    if returncode != 0:
+        print(f"  错误: {''.join(stderr_tail)}")
+        raise RuntimeError(f"whisper-cli 失败: {returncode}")
     
-    # 查找输出文件
+    # 查找输出文件 (一次目录扫描代替逐个候选 stat)
     if not output_json.exists():
-        candidates = [
-            audio_path.with_suffix(".json"),
-            Path(str(audio_path) + ".json"),
-            output_dir / f"{output_name}.wav.json",
-        ]
-        for candidate in candidates:
-            if candidate.exists():
-                output_json = candidate
+        candidates = [f"{audio_path.name}.json", f"{output_name}.wav.json"]
+        with os.scandir(output_dir) as it:
+            found = {entry.name for entry in it if entry.name.endswith(".json")}
+        for name in candidates:
+            if name in found:
+                output_json = output_dir / name
                 break
         else:
-            raise FileNotFoundError(f"转录输出不存在: {candidates}")
+            raise FileNotFoundError(f"转录输出不存在: {[str(output_dir / n) for n in candidates]}")
     
-    # 解析
-    with open(output_json, "r") as f:
-        data = json.load(f)
+    # 解析 (长音频的输出可达数 MB，用 orjson；含不完整 UTF-8 字节时替换后再解析)
+    raw = output_json.read_bytes()
+    try:
+        data = orjson.loads(raw)
+    except orjson.JSONDecodeError:
+        data = orjson.loads(raw.decode("utf-8", errors="replace"))
     
     output_json.unlink(missing_ok=True)
     
     segments = []
     for seg in data.get("transcription", []):
+        offsets = seg.get("offsets") or {}  # 每段只取一次
         segments.append(TranscriptSegment(
-            start=seg.get("offsets", {}).get("from", 0) / 1000.0,
-            end=seg.get("offsets", {}).get("to", 0) / 1000.0,
+            start=offsets.get("from", 0) / 1000.0,
+            end=offsets.get("to", 0) / 1000.0,
             text=seg.get("text", "").strip(),
         ))
     
@@ -107,23 +122,6 @@ def transcribe_audio(
     return segments
 
 
-def load_prompt(template_path: Path, **kwargs) -> str:
-    """加载 prompt 模板并填充变量."""
-    import yaml
-    
-    content = template_path.read_text(encoding="utf-8")
-    
-    # 解析 YAML frontmatter
-    if content.startswith("---"):
-        _, frontmatter, body = content.split("---", 2)
-        metadata = yaml.safe_load(frontmatter)
-        # 提取 body 部分（去掉 frontmatter）
-        content = body.strip()
-    
-    # 填充变量
-    return content.format(**kwargs)
-
-
 def _print_usage_info(response, stage: str = "") -> None:
     """打印 API 用量和价格信息，并更新全局统计."""
     if not hasattr(response, 'usage') or response.usage is None:
@@ -185,31 +183,27 @@ def optimize_transcript(
     }
     lang_name = lang_names.get(output_language, output_language)
     
-    prompt = load_prompt(
-        prompt_path,
+    # 正文与 frontmatter 参数一次解析 (按路径+修改时间缓存，与 Stage 5/6 共用)
+    system_msg, user_template, api_params = load_prompt_with_meta(
+        prompt_path, default_system="你是一位专业的文稿编辑。"
+    )
+    prompt = user_template.format(
         title=title,
         raw_text=raw_text[:8000],  # 限制长度
         output_language=lang_name,
     )
     
-    # 从 prompt frontmatter 获取参数
-    import yaml
-    prompt_meta = yaml.safe_load(
-        prompt_path.read_text(encoding="utf-8").split("---")[1]
-    )
-    api_params = prompt_meta.get("parameters", {})
-    system_msg = prompt_meta.get("system", "你是一位专业的文稿编辑。")
-    
-    client = OpenAI(**settings.get_client_kwargs())
-    
-    response = client.chat.completions.create(
-        model=settings.model,
-        messages=[
-            {"role": "system", "content": system_msg},
-            {"role": "user", "content": prompt}
-        ],
-        **api_params,
-    )
+    client = get_client()
+    
+    with api_slot():
+        response = client.chat.completions.create(
+            model=settings.model,
+            messages=[
+                {"role": "system", "content": system_msg},
+                {"role": "user", "content": prompt}
+            ],
+            **api_params,
+        )
     
     # 打印 Token 用量
     _print_usage_info(response, stage="stage2_transcribe")
@@ -235,6 +229,7 @@ def transcribe_video(
     temp_dir: Optional[Path] = None,
     cache_dir: Optional[Path] = None,
     use_cache: bool = True,
+    optimize: bool = True,
 ) -> VideoTranscript:
     """Stage 2 主函数: 完整的音频提取、转录、优化流程.
     
@@ -245,6 +240,8 @@ def transcribe_video(
         temp_dir: 临时目录
         cache_dir: 缓存目录（用于保存转录结果，避免重复执行）
         use_cache: 是否使用缓存
+        optimize: 是否执行 2c 文稿优化（False 时 optimized_text 为空，
+            由调用方稍后调用 optimize_transcript 补全，便于与后续阶段并行）
         
     Returns:
         VideoTranscript (M1) - AI优化后的可读文稿
@@ -269,15 +266,15 @@ def transcribe_video(
     # 检查缓存
     if use_cache and cache_path.exists():
         print(f"  📦 发现缓存，加载之前的转录结果...")
-        import json
-        with open(cache_path, "r", encoding="utf-8") as f:
-            cached = json.load(f)
+        cached = orjson.loads(cache_path.read_bytes())
         
         segments = [TranscriptSegment(**seg) for seg in cached["segments"]]
         print(f"  ✓ 从缓存加载: {len(segments)} 个片段")
         
         # 2c: AI 文稿优化 (生成 M1) - 这部分不缓存，每次都重新优化
-        optimized_text = optimize_transcript(segments, video_path.stem, output_language)
+        optimized_text = ""
+        if optimize:
+            optimized_text = optimize_transcript(segments, video_path.stem, output_language)
         
         transcript = VideoTranscript(
             video_path=video_path,
@@ -310,7 +307,6 @@ def transcribe_video(
         
         # 保存缓存（原始转录结果）
         if use_cache:
-            import json
             cache_data = {
                 "video_path": str(video_path),
                 "video_hash": video_hash,
@@ -318,12 +314,13 @@ def transcribe_video(
                 "detected_language": "auto",
                 "segments": [seg.to_dict() for seg in segments]
             }
-            with open(cache_path, "w", encoding="utf-8") as f:
-                json.dump(cache_data, f, ensure_ascii=False, indent=2)
+            cache_path.write_bytes(orjson.dumps(cache_data, option=orjson.OPT_INDENT_2))
             print(f"  💾 转录结果已缓存: {cache_path}")
         
         # 2c: AI 文稿优化 (生成 M1)
-        optimized_text = optimize_transcript(segments, video_path.stem, output_language)
+        optimized_text = ""
+        if optimize:
+            optimized_text = optimize_transcript(segments, video_path.stem, output_language)
         
         # 创建 VideoTranscript (M1)
         transcript = VideoTranscript(
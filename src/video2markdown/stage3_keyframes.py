@@ -13,8 +13,10 @@ from pathlib import Path
 from typing import Optional
 
 import cv2
+import numpy as np
 
 from video2markdown.models import VideoInfo, KeyFrame, KeyFrames
+from video2markdown.video_io import open_capture
 
 
 def extract_candidate_frames(
@@ -49,15 +51,14 @@ def extract_candidate_frames(
     # 1. 从稳定区间采样
     stable_count = 0
     for start, end in video_info.stable_intervals:
-        current = start
-        while current < end:
+        # start + i * interval 直接计算，避免逐次累加的浮点误差
+        for current in np.arange(start, end, interval_sec).tolist():
             frames.append(KeyFrame(
                 timestamp=current,
                 source="stable_interval",
                 reason=f"稳定区间采样 @ {current:.1f}s"
             ))
             stable_count += 1
-            current += interval_sec
     
     # 2. 从场景变化点添加（如果不在稳定区间内）
     scene_count = 0
@@ -145,7 +146,7 @@ def extract_frame_at_timestamp(
     Returns:
         输出图片路径
     """
-    cap = cv2.VideoCapture(str(video_path))
+    cap = open_capture(video_path)
     if not cap.isOpened():
         raise RuntimeError(f"无法打开视频: {video_path}")
     
@@ -11,12 +11,43 @@
 注意: 动画稳定检测已在 Stage 1 完成，Stage 3 只从稳定区间采样
 """
 
+import bisect
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 import cv2
-import numpy as np
+import orjson
 
-from video2markdown.models import KeyFrame, KeyFrames, VideoTranscript
+from video2markdown.config import settings
+from video2markdown.models import KeyFrames, VideoTranscript
+from video2markdown.video_io import capture_scope, get_capture, read_frame_at
+
+# 文字检测逻辑变化时递增，使旧缓存失效
+_TEXT_CACHE_VERSION = 2
+
+# 视觉指示词
+_VISUAL_INDICATORS = [
+    "如图", "如图所示", "看这个", "展示", "屏幕", "页面",
+    "这边", "这里", "这个", "界面", "图表", "数据",
+    "PPT", "板书", "代码", "演示"
+]
+
+# 抽象概念
+_ABSTRACT_CONCEPTS = [
+    "架构", "流程", "结构", "框架", "模型", "系统",
+    "原理", "机制", "算法", "设计", "方案"
+]
+
+
+def _keyword_re(words: list[str]) -> re.Pattern:
+    """将关键词表编译为单个正则 (一次扫描文本，代替逐词子串查找)."""
+    return re.compile("|".join(re.escape(w) for w in words))
+
+
+_VISUAL_REF_RE = _keyword_re(_VISUAL_INDICATORS)
+_ABSTRACT_RE = _keyword_re(_ABSTRACT_CONCEPTS)
 
 
 def filter_keyframes(
@@ -49,45 +80,123 @@ def filter_keyframes(
         return KeyFrames(video_path=video_path, frames=[])
     
     filtered = []
+    selected_times = []  # 已选帧时间点 (有序)，供去重二分查找
+    
+    # 第三层转录上下文检查只依赖文字稿，开销很小，先对全部候选帧完成；
+    # 文字稿已足够清晰的帧无论文字检测结果如何都会被跳过，无需解码
+    texts = transcript.get_texts_around(candidates.get_timestamps(), window=8.0)
+    contexts = [_check_transcript_context(text) for text in texts]
+    need_indices = [i for i, (needs_visual, _) in enumerate(contexts) if needs_visual]
     
+    # 第二层文字检测需要解码视频帧，对剩余候选帧并行完成
+    timestamps = [candidates.frames[i].timestamp for i in need_indices]
+    cache = _get_text_cache()
+    cache_key = _text_cache_key(video_path, timestamps) if cache else None
+    cached = cache.get(cache_key) if cache else None
+    if cached is not None:
+        print(f"  📦 文字检测结果来自缓存，跳过解码")
+        detected = [tuple(r) for r in cached["results"]]
+    else:
+        with capture_scope():
+            detected = _detect_text_parallel(video_path, timestamps) if timestamps else []
+        if cache:
+            cache.set(cache_key, {"results": detected})
+    
+    text_results = [None] * len(candidates.frames)
+    for i, result in zip(need_indices, detected):
+        text_results[i] = result
+    
+    # 逐帧判定结果先收集，循环结束后一次输出
+    log = []
     for i, frame in enumerate(candidates.frames):
-        print(f"  检查帧 {i+1}/{len(candidates.frames)} @ {frame.timestamp:.1f}s...", end=" ")
+        prefix = f"  检查帧 {i+1}/{len(candidates.frames)} @ {frame.timestamp:.1f}s..."
         
         # 第一层: 时间戳去重
-        if _is_too_close(frame.timestamp, filtered, min_interval):
-            print("SKIP (距离太近)")
+        if _is_too_close(frame.timestamp, selected_times, min_interval):
+            log.append(f"{prefix} SKIP (距离太近)")
             continue
         
-        # 第二层: 文字检测
-        has_text, text_ratio = _detect_text_content(video_path, frame.timestamp)
-        if not has_text and text_ratio < 0.02:
-            print(f"SKIP (无显著文字, 密度={text_ratio:.3f})")
-            continue
+        # 第二层: 文字检测 (未解码的帧由第三层跳过)
+        needs_visual, reason = contexts[i]
+        if needs_visual:
+            has_text, text_ratio = text_results[i]
+            if not has_text and text_ratio < 0.02:
+                log.append(f"{prefix} SKIP (无显著文字, 密度={text_ratio:.3f})")
+                continue
         
         # 第三层: 转录上下文检查
-        needs_visual, reason = _check_transcript_context(
-            frame.timestamp, transcript
-        )
         if not needs_visual:
-            print(f"SKIP (文字稿已足够清晰: {reason})")
+            log.append(f"{prefix} SKIP (文字稿已足够清晰: {reason})")
             continue
         
         # 通过筛选
         frame.reason = f"{frame.reason} | {reason} | 文字密度={text_ratio:.2f}"
         filtered.append(frame)
-        print(f"KEEP ({reason})")
+        bisect.insort(selected_times, frame.timestamp)
+        log.append(f"{prefix} KEEP ({reason})")
     
+    print("\n".join(log))
     print(f"  ✓ 筛选完成: {len(filtered)}/{len(candidates.frames)} 个帧通过")
     
     return KeyFrames(video_path=video_path, frames=filtered)
 
 
-def _is_too_close(timestamp: float, selected_frames: list[KeyFrame], min_interval: float) -> bool:
-    """检查是否与已选帧太近."""
-    for f in selected_frames:
-        if abs(f.timestamp - timestamp) < min_interval:
-            return True
-    return False
+def _get_text_cache():
+    """获取文字检测结果缓存 (与 Stage 1 共用 analysis_cache 开关)，未启用时返回 None."""
+    from video2markdown.llm_cache import FileCacheBackend
+    
+    if not settings.analysis_cache:
+        return None
+    return FileCacheBackend(settings.temp_dir / "cache" / "stage4")
+
+
+def _text_cache_key(video_path: Path, timestamps: list[float]) -> str:
+    """缓存键: 文件路径 + 大小 + 修改时间 + 检测参数 + 候选时间点."""
+    import hashlib
+    
+    st = video_path.stat()
+    raw = (
+        f"{_TEXT_CACHE_VERSION}|{video_path.resolve()}|{st.st_size}|{st.st_mtime_ns}"
+        f"|{settings.text_detect_width}|{settings.text_detect_otsu}"
+    )
+    digest = hashlib.sha256(raw.encode("utf-8"))
+    digest.update(orjson.dumps(timestamps))
+    return digest.hexdigest()
+
+
+def _is_too_close(timestamp: float, selected_times: list[float], min_interval: float) -> bool:
+    """检查是否与已选帧太近.
+    
+    selected_times 为已选帧的有序时间点，只需比较二分位置两侧的最近邻。
+    """
+    pos = bisect.bisect_left(selected_times, timestamp)
+    if pos < len(selected_times) and selected_times[pos] - timestamp < min_interval:
+        return True
+    return pos > 0 and timestamp - selected_times[pos - 1] < min_interval
+
+
+def _detect_text_parallel(video_path: Path, timestamps: list[float]) -> list[tuple[bool, float]]:
+    """多线程检测各时间点的文字内容，结果与 timestamps 顺序一致.
+    
+    时间点按顺序切分为连续的段，每个线程用自己的 VideoCapture 读取一段，
+    段内仍是顺序读取。
+    """
+    workers = settings.frame_workers or min(4, os.cpu_count() or 1)
+    workers = max(1, min(workers, len(timestamps)))
+    if workers == 1:
+        return [_detect_text_content(video_path, ts) for ts in timestamps]
+    
+    size = -(-len(timestamps) // workers)  # 向上取整
+    chunks = [timestamps[i:i + size] for i in range(0, len(timestamps), size)]
+    
+    def detect_chunk(chunk: list[float]) -> list[tuple[bool, float]]:
+        return [_detect_text_content(video_path, ts) for ts in chunk]
+    
+    results = []
+    with ThreadPoolExecutor(max_workers=len(chunks)) as executor:
+        for part in executor.map(detect_chunk, chunks):
+            results.extend(part)
+    return results
 
 
 def _detect_text_content(video_path: Path, timestamp: float) -> tuple[bool, float]:
@@ -97,25 +206,32 @@ def _detect_text_content(video_path: Path, timestamp: float) -> tuple[bool, floa
         (has_text, text_ratio)
     """
     # 提取单帧 (低质量，仅用于分析)
-    cap = cv2.VideoCapture(str(video_path))
-    fps = cap.get(cv2.CAP_PROP_FPS)
-    frame_idx = int(timestamp * fps)
-    cap.set(cv2.CAP_PROP_POS_FRAMES, frame_idx)
+    frame = read_frame_at(get_capture(video_path), timestamp)
     
-    ret, frame = cap.read()
-    cap.release()
-    
-    if not ret:
+    if frame is None:
         return False, 0.0
     
+    # 可选: 先缩小再检测 (Canny 耗时与像素数成正比)
+    scale = 1.0
+    detect_width = settings.text_detect_width
+    if 0 < detect_width < frame.shape[1]:
+        scale = detect_width / frame.shape[1]
+        frame = cv2.resize(frame, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+    
     # 边缘检测识别文字区域
     gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-    edges = cv2.Canny(gray, 50, 150)
+    low, high = 50, 150
+    if settings.text_detect_otsu:
+        # 按画面亮度分布自适应阈值 (Otsu 只需一次直方图统计)，暗色幻灯片与强光画面更稳定
+        otsu, _ = cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
+        low, high = 0.5 * otsu, otsu
+    edges = cv2.Canny(gray, low, high)
     
-    # 计算文字区域比例
-    text_pixels = np.sum(edges > 0)
-    total_pixels = edges.shape[0] * edges.shape[1]
-    text_ratio = text_pixels / total_pixels
+    # 计算文字区域比例 (countNonZero 单次扫描，不生成布尔掩码)
+    # 边缘像素数约与边长成正比，按缩放比例折算回原分辨率下的比例
+    text_pixels = cv2.countNonZero(edges)
+    total_pixels = edges.size
+    text_ratio = text_pixels / total_pixels * scale
     
     # 判断是否有意义的内容 (5%-50% 是合理的范围)
     has_text = 0.05 < text_ratio < 0.50
@@ -123,41 +239,23 @@ def _detect_text_content(video_path: Path, timestamp: float) -> tuple[bool, floa
     return has_text, text_ratio
 
 
-def _check_transcript_context(
-    timestamp: float,
-    transcript: VideoTranscript,
-    window: float = 8.0
-) -> tuple[bool, str]:
-    """检查转录文本是否表明需要配图.
+def _check_transcript_context(text: str) -> tuple[bool, str]:
+    """检查候选帧时间窗口内的转录文本是否表明需要配图.
     
     Returns:
         (needs_visual, reason)
     """
-    # 获取时间窗口内的文本
-    text = transcript.get_text_around(timestamp, window)
-    
     if not text or len(text.strip()) < 10:
         return True, "文字稿过短，需要图片补充"
     
     # 检查视觉指示词
-    visual_indicators = [
-        "如图", "如图所示", "看这个", "展示", "屏幕", "页面",
-        "这边", "这里", "这个", "界面", "图表", "数据",
-        "PPT", "板书", "代码", "演示"
-    ]
-    
-    has_visual_ref = any(word in text for word in visual_indicators)
+    has_visual_ref = _VISUAL_REF_RE.search(text) is not None
     
     if has_visual_ref:
         return True, "检测到视觉引用"
     
     # 检查抽象概念
-    abstract_concepts = [
-        "架构", "流程", "结构", "框架", "模型", "系统",
-        "原理", "机制", "算法", "设计", "方案"
-    ]
-    
-    has_abstract = any(concept in text for concept in abstract_concepts)
+    has_abstract = _ABSTRACT_RE.search(text) is not None
     
     if has_abstract:
         return True, "包含抽象概念，图片有助于理解"
@@ -10,18 +10,43 @@
     4. 生成图片描述
 """
 
-import base64
-import threading
+import io
+import re
+import time
 from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Optional
+from typing import Iterator, Optional
 
 import cv2
+import numpy as np
+import orjson
 from openai import OpenAI
 
 from video2markdown.config import settings
+from video2markdown.llm import api_slot, get_client
+from video2markdown.llm_cache import get_llm_cache, make_cache_key
 from video2markdown.models import ImageDescription, ImageDescriptions, KeyFrame, KeyFrames, VideoTranscript
+from video2markdown.prompts import load_prompt_with_meta
 from video2markdown.stats import get_stats
+from video2markdown.video_io import capture_scope, get_capture, read_frame_at
+
+try:
+    import pybase64 as base64  # SIMD 实现，编码时释放 GIL
+except ImportError:
+    import base64
+
+try:
+    import PIL
+    from PIL import Image
+    # pillow-simd 以 .postN 版本号发布，其 JPEG 编码走 AVX2 路径；
+    # 标准 Pillow 与 OpenCV 同为 libjpeg-turbo，无收益，仍用 cv2.imencode
+    _SIMD_JPEG = ".post" in PIL.__version__
+except ImportError:
+    _SIMD_JPEG = False
+
+# 列表项 (- 或 • 开头)，一次扫描提取
+_KEY_ELEM_RE = re.compile(r"^[ \t]*[-•][ \t]*(.+?)[ \t\r]*$", re.MULTILINE)
 
 
 def analyze_images(
@@ -50,205 +75,411 @@ def analyze_images(
         print(f"  ⏭️  无关键帧，跳过图像分析")
         return ImageDescriptions(descriptions=[])
     
-    client = OpenAI(**settings.get_client_kwargs())
+    client = get_client()
     output_dir.mkdir(parents=True, exist_ok=True)
     
     # 获取并发配置
-    api_concurrency = settings.api_max_concurrency
-    image_concurrency = min(settings.image_max_concurrency, api_concurrency)
+    # 分析线程几乎都在等待网络，默认让在途请求数用满 API 并发上限
+    api_concurrency = max(1, settings.api_max_concurrency)
+    image_concurrency = settings.image_max_concurrency
+    if image_concurrency <= 0:
+        image_concurrency = api_concurrency
+    image_concurrency = min(image_concurrency, api_concurrency)
     
     print(f"  并发配置: API={api_concurrency}, 图片分析={image_concurrency}")
     
-    # 阶段1: 串行提取所有帧（视频读取不支持并发）
-    print(f"  [阶段1/2] 提取 {len(keyframes.frames)} 张原始帧...")
-    frame_tasks = []
-    for i, frame in enumerate(keyframes.frames, 1):
-        frame_path = output_dir / f"frame_{i:04d}_{frame.timestamp:.1f}s.jpg"
-        _extract_original_frame(video_path, frame.timestamp, frame_path)
-        api_image_path = _prepare_for_api(frame_path, max_size)
-        context = transcript.get_text_around(frame.timestamp, window=10.0)
-        frame_tasks.append({
-            'index': i,
-            'frame': frame,
-            'frame_path': frame_path,
-            'api_image_path': api_image_path,
-            'context': context,
-        })
-    print(f"    ✓ 提取完成")
-    
     from video2markdown.progress import HeartbeatMonitor
     
-    # 阶段2: 并发分析图片
-    print(f"  [阶段2/2] 并发分析图片...")
-    print(f"    ⏳ AI 正在分析 {len(frame_tasks)} 张图片，每张约需 5-15 秒...")
-    descriptions = [None] * len(frame_tasks)  # 预分配列表，保持顺序
-    stats_lock = threading.Lock()
+    # 提取与分析流水线: 视频读取不支持并发，主线程串行提取帧，
+    # 每提取一帧立即提交给线程池分析，提取耗时被 API 延迟掩盖
+    print(f"  提取并分析 {len(keyframes.frames)} 张图片 (提取与 AI 分析流水线并行)...")
+    print(f"    ⏳ AI 分析每张图片约需 5-15 秒...")
+    descriptions = [None] * len(keyframes.frames)  # 预分配列表，保持顺序
+    
+    def prepared(task: dict) -> str:
+        """压缩任务中的帧并编码为 data URL (结果缓存在任务中，随即释放原始帧).
+        
+        批量失败逐张重试时直接复用，不再重复 JPEG 与 base64 编码。
+        """
+        if 'image_data' not in task:
+            task['image_data'] = _encode_image(_prepare_for_api(task.pop('image'), max_size))
+        return task['image_data']
+    
+    def frame_url(task: dict) -> str:
+        """原图的 URL (等待后台写盘完成，确保文件已存在)."""
+        task['saved'].result()
+        return _frame_url(url_prefix, task['frame_path'])
     
     def analyze_single(task: dict) -> tuple[int, ImageDescription]:
-        """分析单张图片，返回 (索引, 结果)."""
+        """压缩并分析单张图片，返回 (索引, 结果)."""
         idx = task['index']
         frame = task['frame']
         
+        if url_prefix:
+            try:
+                desc = _analyze_single_image(
+                    client,
+                    frame_url(task),
+                    frame.timestamp,
+                    task['frame_path'],
+                    task['context'],
+                )
+                return idx - 1, desc
+            except Exception as e:
+                print(f"    ⚠️  图片 {idx} URL 引用失败，改用 base64: {e}")
+        
+        image_data = prepared(task)
         desc = _analyze_single_image(
             client,
-            task['api_image_path'],
+            image_data,
             frame.timestamp,
             task['frame_path'],
             task['context'],
         )
         return idx - 1, desc  # 转换为 0-based 索引
     
-    # 启动心跳监控，显示分析仍在进行
-    heartbeat = HeartbeatMonitor(f"AI分析{len(frame_tasks)}张图片", interval=15)
-    heartbeat.start()
-    
-    with ThreadPoolExecutor(max_workers=image_concurrency) as executor:
-        # 提交所有任务
-        future_to_task = {
-            executor.submit(analyze_single, task): task 
-            for task in frame_tasks
-        }
+    def analyze_batch(batch: list[dict]) -> list[tuple[int, ImageDescription]]:
+        """多图合并为一次请求分析，解析失败时逐张重试."""
+        if len(batch) == 1:
+            return [analyze_single(batch[0])]
         
-        # 收集结果（保持顺序输出）
-        completed = 0
-        for future in as_completed(future_to_task):
+        if url_prefix:
+            images = [frame_url(task) for task in batch]
+        else:
+            images = [prepared(task) for task in batch]
+        try:
+            descs = _analyze_image_batch(client, batch, images)
+            return [(task['index'] - 1, desc) for task, desc in zip(batch, descs)]
+        except Exception as e:
+            print(f"    ⚠️  批量分析失败，逐张重试 ({len(batch)} 张): {e}")
+        
+        results = []
+        for task in batch:
             try:
-                idx, desc = future.result()
-                descriptions[idx] = desc
-                completed += 1
+                results.append(analyze_single(task))
+            except Exception as e:
+                print(f"    ✗ 图片 {task['index']} 分析失败: {e}")
+                results.append((task['index'] - 1, _failed_description(task)))
+        return results
+    
+    batch_size = max(1, settings.vision_batch_size)
+    frame_ext = "webp" if settings.keyframe_format.lower() == "webp" else "jpg"
+    url_prefix = settings.vision_image_url_prefix.rstrip("/")
+    if url_prefix:
+        print(f"  图片以 URL 引用: {url_prefix}/")
+    
+    # Batch API 模式: 先收集全部任务，提取结束后一次性提交
+    use_batch_api = settings.vision_batch_api
+    batch_api_tasks = []
+    if use_batch_api:
+        print(f"  使用 Batch API 提交 (费用更低，完成时间取决于服务端排队)")
+    
+    def submit(batch: list[dict]) -> None:
+        """提交一组任务: 实时模式交给线程池，Batch API 模式先暂存."""
+        if use_batch_api:
+            batch_api_tasks.extend(batch)
+        else:
+            future_to_batch[executor.submit(analyze_batch, batch)] = batch
+    
+    # 感知哈希去重：与已提交画面几乎相同的帧不再调用 API，直接复用描述
+    dedup_threshold = settings.dedup_hamming_threshold
+    dedup_method = settings.dedup_hash.lower()
+    image_hash = _dhash if dedup_method == "dhash" else _phash
+    unique_hashes = []  # [(0-based 索引, 哈希)]
+    duplicates = []  # [(task, 复用的 0-based 索引)]
+    
+    # 心跳监控显示分析仍在进行；多个工作线程同时压缩/编码图片时 OpenCV 内部
+    # 线程池会按核数再开线程，并发阶段限制为单线程避免过度订阅。
+    # 均由 with 管理，出错时同样停止心跳、恢复线程数
+    with HeartbeatMonitor(f"AI分析{len(keyframes.frames)}张图片", interval=15), \
+            _cv2_num_threads(1), \
+            ThreadPoolExecutor(max_workers=image_concurrency) as executor, \
+            ThreadPoolExecutor(max_workers=2) as save_pool:
+        # 边提取边提交（每凑满 batch_size 张提交一次）
+        future_to_batch = {}
+        pending = []
+        save_futures = []
+        # 全部关键帧的转录上下文一次批量查询
+        contexts = transcript.get_texts_around(keyframes.get_timestamps(), window=10.0)
+        with capture_scope():
+            for i, frame in enumerate(keyframes.frames, 1):
+                frame_path = output_dir / f"frame_{i:04d}_{frame.timestamp:.1f}s.{frame_ext}"
+                image = _read_original_frame(video_path, frame.timestamp)
+                # 原图在后台线程编码写盘，主线程继续解码下一帧
+                saved = save_pool.submit(_save_original_frame, image, frame_path)
+                save_futures.append(saved)
+                # 之后只需 API 尺寸，缩小一次供感知哈希与压缩共用
+                image = _fit_size(image, max_size)
+                context = contexts[i - 1]
+                task = {
+                    'index': i,
+                    'frame': frame,
+                    'frame_path': frame_path,
+                    'context': context,
+                    'saved': saved,
+                }
                 
-                # 按顺序输出已完成的任务
-                print(f"  分析图片 {idx+1}/{len(frame_tasks)} @ {desc.timestamp:.1f}s...")
-                print(f"    ✓ {desc.description[:60]}...")
+                if dedup_threshold > 0:
+                    phash = image_hash(image)
+                    same_as = next(
+                        (j for j, h in unique_hashes if (phash ^ h).bit_count() <= dedup_threshold),
+                        None,
+                    )
+                    if same_as is not None:
+                        duplicates.append((task, same_as))
+                        continue
+                    unique_hashes.append((i - 1, phash))
                 
+                task['image'] = image
+                pending.append(task)
+                if len(pending) >= batch_size:
+                    submit(pending)
+                    pending = []
+        if pending:
+            submit(pending)
+        if duplicates:
+            print(f"    ♻️  {len(duplicates)} 张与已有画面重复，复用描述 ({dedup_method} 距离 ≤ {dedup_threshold})")
+        print(f"    ✓ 提取完成，等待 AI 分析...")
+        
+        if batch_api_tasks:
+            if url_prefix:
+                images = [frame_url(task) for task in batch_api_tasks]
+            else:
+                images = list(executor.map(prepared, batch_api_tasks))
+            try:
+                results = _analyze_via_batch_api(client, batch_api_tasks, images)
             except Exception as e:
-                task = future_to_task[future]
-                print(f"    ✗ 图片 {task['index']} 分析失败: {e}")
-                # 创建一个空的描述作为占位
-                descriptions[task['index']-1] = ImageDescription(
-                    timestamp=task['frame'].timestamp,
-                    image_path=task['frame_path'],
-                    description="[图片分析失败]",
-                    key_elements=[],
-                    related_transcript=task['context'],
-                )
+                print(f"    ✗ Batch 任务失败: {e}")
+                results = [None] * len(batch_api_tasks)
+            
+            for task, desc in zip(batch_api_tasks, results):
+                task.pop('image', None)
+                task.pop('image_data', None)
+                if desc is None:
+                    print(f"    ✗ 图片 {task['index']} 分析失败")
+                    desc = _failed_description(task)
+                descriptions[task['index']-1] = desc
+        
+        # 收集结果（保持顺序输出）
+        for future in as_completed(future_to_batch):
+            # 分析已结束，释放任务持有的帧数据
+            for task in future_to_batch[future]:
+                task.pop('image', None)
+                task.pop('image_data', None)
+            try:
+                results = future.result()
+            except Exception as e:
+                for task in future_to_batch[future]:
+                    print(f"    ✗ 图片 {task['index']} 分析失败: {e}")
+                    # 创建一个空的描述作为占位
+                    descriptions[task['index']-1] = _failed_description(task)
+                continue
+            
+            # 一批结果合并为一次输出，避免与工作线程的日志交错
+            lines = []
+            for idx, desc in results:
+                descriptions[idx] = desc
+                lines.append(f"  分析图片 {idx+1}/{len(descriptions)} @ {desc.timestamp:.1f}s...")
+                lines.append(f"    ✓ {desc.description[:60]}...")
+            print("\n".join(lines))
+        
+        # 原图写盘失败时在此抛出
+        for saved in save_futures:
+            saved.result()
+    
+    for task, same_as in duplicates:
+        source = descriptions[same_as]
+        descriptions[task['index']-1] = ImageDescription(
+            timestamp=task['frame'].timestamp,
+            image_path=task['frame_path'],
+            description=source.description,
+            key_elements=list(source.key_elements),
+            related_transcript=task['context'],
+        )
     
-    heartbeat.stop()
     print(f"  ✓ 完成 {len([d for d in descriptions if d is not None])} 张图片分析")
     return ImageDescriptions(descriptions=descriptions)
 
 
-def _extract_original_frame(
-    video_path: Path,
-    timestamp: float,
-    output_path: Path,
-    quality: int = 95,
-) -> Path:
-    """提取原始视频帧 (无压缩，高质量)."""
-    cap = cv2.VideoCapture(str(video_path))
-    fps = cap.get(cv2.CAP_PROP_FPS)
-    frame_idx = int(timestamp * fps)
-    cap.set(cv2.CAP_PROP_POS_FRAMES, frame_idx)
-    
-    ret, frame = cap.read()
-    cap.release()
-    
-    if not ret:
+@contextmanager
+def _cv2_num_threads(n: int) -> Iterator[None]:
+    """临时设置 OpenCV 线程数，退出时 (包括异常) 恢复原值."""
+    previous = cv2.getNumThreads()
+    cv2.setNumThreads(n)
+    try:
+        yield
+    finally:
+        cv2.setNumThreads(previous)
+
+
+def _failed_description(task: dict) -> ImageDescription:
+    """分析失败时的占位描述."""
+    return ImageDescription(
+        timestamp=task['frame'].timestamp,
+        image_path=task['frame_path'],
+        description="[图片分析失败]",
+        key_elements=[],
+        related_transcript=task['context'],
+    )
+
+
+def _read_original_frame(video_path: Path, timestamp: float) -> np.ndarray:
+    """读取原始视频帧 (无压缩)，返回解码出的 BGR 帧."""
+    frame = read_frame_at(get_capture(video_path), timestamp)
+    
+    if frame is None:
         raise RuntimeError(f"无法读取 {timestamp}s 的帧")
+    return frame
+
+
+def _save_original_frame(frame: np.ndarray, output_path: Path, quality: int = 95) -> None:
+    """保存高质量原图.
     
-    # 保存高质量原图
+    按 output_path 后缀选择编码: .webp 为无损 WebP，其余为 JPEG (quality)。
+    """
     output_path.parent.mkdir(parents=True, exist_ok=True)
-    cv2.imwrite(str(output_path), frame, [cv2.IMWRITE_JPEG_QUALITY, quality])
-    return output_path
+    if output_path.suffix == ".webp":
+        params = [cv2.IMWRITE_WEBP_QUALITY, 101]  # >100 为无损
+    else:
+        params = [cv2.IMWRITE_JPEG_QUALITY, quality]
+    cv2.imwrite(str(output_path), frame, params)
 
 
-def _prepare_for_api(image_path: Path, max_size: int) -> Path:
-    """准备图片用于 API 调用 (压缩但保持清晰)."""
-    img = cv2.imread(str(image_path))
-    if img is None:
-        raise RuntimeError(f"无法读取图片: {image_path}")
-    
+def _phash(image: np.ndarray) -> int:
+    """计算 64 位感知哈希 (DCT 低频 8x8 与中位数比较)."""
+    gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+    small = cv2.resize(gray, (32, 32), interpolation=cv2.INTER_AREA)
+    low = cv2.dct(np.float32(small))[:8, :8]
+    bits = (low > np.median(low)).flatten()
+    return int.from_bytes(np.packbits(bits).tobytes(), "big")
+
+
+def _dhash(image: np.ndarray) -> int:
+    """计算 64 位差异哈希 (9x8 灰度缩略图相邻像素比较)，比 pHash 少一次 DCT."""
+    gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+    small = cv2.resize(gray, (9, 8), interpolation=cv2.INTER_AREA)
+    bits = (small[:, 1:] > small[:, :-1]).flatten()
+    return int.from_bytes(np.packbits(bits).tobytes(), "big")
+
+
+def _fit_size(img: np.ndarray, max_size: int) -> np.ndarray:
+    """等比例缩小到最长边不超过 max_size (已满足时原样返回)."""
     h, w = img.shape[:2]
+    if max(h, w) <= max_size:
+        return img
     
-    # 等比例缩放
-    if max(h, w) > max_size:
-        scale = max_size / max(h, w)
-        new_w = int(w * scale)
-        new_h = int(h * scale)
-        img = cv2.resize(img, (new_w, new_h), interpolation=cv2.INTER_AREA)
-    
-    # 保存临时文件
-    temp_path = image_path.parent / f"{image_path.stem}_api.jpg"
-    cv2.imwrite(str(temp_path), img, [cv2.IMWRITE_JPEG_QUALITY, 85])
-    
-    return temp_path
+    scale = max_size / max(h, w)
+    new_w = int(w * scale)
+    new_h = int(h * scale)
+    return cv2.resize(img, (new_w, new_h), interpolation=cv2.INTER_AREA)
 
 
-def _load_prompt_with_meta(template_path: Path):
-    """加载 prompt 模板，返回 (system_msg, user_template, api_params)."""
-    import yaml
+def _prepare_for_api(img: np.ndarray, max_size: int) -> memoryview:
+    """准备图片用于 API 调用 (压缩但保持清晰)，返回 JPEG 数据.
     
-    content = template_path.read_text(encoding="utf-8")
+    直接使用提取时解码出的帧，不再从磁盘读回图片。
+    返回编码缓冲区的 memoryview，base64 编码直接读取，不再复制一份 bytes。
+    """
+    img = _fit_size(img, max_size)
     
-    # 解析 YAML frontmatter
-    _, frontmatter, body = content.split("---", 2)
-    metadata = yaml.safe_load(frontmatter)
+    # 内存中编码，不落临时文件
+    if _SIMD_JPEG:
+        out = io.BytesIO()
+        rgb = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
+        Image.fromarray(rgb).save(out, "JPEG", quality=85, optimize=False, progressive=False)
+        return out.getbuffer()
     
-    system_msg = metadata.get("system", "你是一位专业的视频内容分析师。")
-    api_params = metadata.get("parameters", {})
-    user_template = body.strip()
+    ok, buf = cv2.imencode(".jpg", img, [cv2.IMWRITE_JPEG_QUALITY, 85])
+    if not ok:
+        raise RuntimeError("图片编码失败")
     
-    return system_msg, user_template, api_params
+    return memoryview(buf)
 
 
 def _analyze_single_image(
     client: OpenAI,
-    image_path: Path,
+    image: bytes | str,
     timestamp: float,
     original_path: Path,
     context: str,
 ) -> ImageDescription:
     """使用 Kimi Vision API 分析单张图片."""
+    request = _single_image_request(image, context)
+    content = _completion_content(client, request)
+    return _description_from_content(content, timestamp, original_path, context)
+
+
+def _completion_content(client: OpenAI, request: dict) -> str:
+    """调用 API 并返回响应文本.
     
-    # 读取并编码图片
-    with open(image_path, "rb") as f:
-        image_data = base64.b64encode(f.read()).decode("utf-8")
+    启用响应缓存时，相同请求 (模型 + 消息 + 参数，图片以 base64 内容参与计算)
+    直接复用上次的结果；以 URL 引用的图片内容可能变化，不缓存。
+    """
+    params = {k: v for k, v in request.items() if k not in ("model", "messages")}
+    cache = None if _references_image_url(request["messages"]) else get_llm_cache()
+    cache_key = make_cache_key(request["model"], request["messages"], params) if cache else ""
+    cached = cache.get(cache_key) if cache else None
+    if cached is not None:
+        return cached["content"]
+    
+    # 调用 API
+    with api_slot():
+        response = client.chat.completions.create(**request)
+    
+    content = response.choices[0].message.content
+    
+    # 打印 Token 用量并更新全局统计
+    _print_usage_info(response, stage="stage5_analyze_images")
     
+    if cache:
+        cache.set(cache_key, {"content": content})
+    return content
+
+
+def _references_image_url(messages: list[dict]) -> bool:
+    """消息中是否有以 URL (而非 data URL) 引用的图片."""
+    return any(
+        part.get("type") == "image_url" and not part["image_url"]["url"].startswith("data:")
+        for message in messages
+        if isinstance(message["content"], list)
+        for part in message["content"]
+    )
+
+
+def _single_image_request(image: bytes | str, context: str) -> dict:
+    """构造单图分析的 chat.completions 请求参数 (实时调用与 Batch API 共用)."""
     # 加载 prompt 模板
     prompt_path = settings.prompts_dir / "image_analysis.md"
     if not prompt_path.exists():
         raise FileNotFoundError(f"Prompt 文件不存在: {prompt_path}")
     
-    system_msg, user_template, api_params = _load_prompt_with_meta(prompt_path)
+    system_msg, user_template, api_params = load_prompt_with_meta(prompt_path)
     user_content = user_template.format(context=context[:500])
     
-    # 调用 API
-    response = client.chat.completions.create(
-        model=settings.vision_model,
-        messages=[
+    return {
+        "model": settings.vision_model,
+        "messages": [
             {"role": "system", "content": system_msg},
             {"role": "user", "content": [
                 {"type": "text", "text": user_content},
-                {"type": "image_url", "image_url": {
-                    "url": f"data:image/jpeg;base64,{image_data}"
-                }}
+                _image_part(image),
             ]}
         ],
         **api_params,
-    )
-    
-    content = response.choices[0].message.content
-    
-    # 打印 Token 用量并更新全局统计
-    _print_usage_info(response, stage="stage5_analyze_images")
-    
+    }
+
+
+def _description_from_content(
+    content: str,
+    timestamp: float,
+    original_path: Path,
+    context: str,
+) -> ImageDescription:
+    """将单图分析的响应文本转为 ImageDescription."""
     # 解析响应 (简单处理)
     description = content.strip()
     key_elements = _extract_key_elements(content)
     
-    # 清理临时 API 图片
-    image_path.unlink(missing_ok=True)
-    
     return ImageDescription(
         timestamp=timestamp,
         image_path=original_path,  # 指向原始高质量图片
@@ -258,6 +489,175 @@ def _analyze_single_image(
     )
 
 
+def _analyze_via_batch_api(
+    client: OpenAI,
+    tasks: list[dict],
+    images: list[bytes | str],
+) -> list[Optional[ImageDescription]]:
+    """通过 Batch API 一次性提交全部单图请求，等待完成后按顺序返回结果.
+    
+    未成功的请求对应位置为 None，由调用方降级处理。
+    """
+    lines = []
+    for i, (task, image) in enumerate(zip(tasks, images)):
+        lines.append(orjson.dumps({
+            "custom_id": str(i),
+            "method": "POST",
+            "url": "/v1/chat/completions",
+            "body": _single_image_request(image, task['context']),
+        }))
+    
+    batch_file = client.files.create(
+        file=("stage5_batch.jsonl", b"\n".join(lines)),
+        purpose="batch",
+    )
+    batch = client.batches.create(
+        input_file_id=batch_file.id,
+        endpoint="/v1/chat/completions",
+        completion_window="24h",
+    )
+    print(f"    📨 已提交 Batch 任务 {batch.id} ({len(tasks)} 张)，等待完成...")
+    
+    batch = _wait_for_batch(client, batch.id)
+    if batch.status != "completed":
+        print(f"    ⚠️  Batch 任务结束状态: {batch.status}")
+    
+    results = [None] * len(tasks)
+    if not batch.output_file_id:
+        return results
+    
+    for line in client.files.content(batch.output_file_id).text.splitlines():
+        if not line.strip():
+            continue
+        try:
+            item = orjson.loads(line)
+            i = int(item["custom_id"])
+            response = item.get("response") or {}
+            if response.get("status_code") != 200:
+                continue
+            body = response.get("body") or {}
+            content = body["choices"][0]["message"]["content"]
+            if not 0 <= i < len(tasks):
+                raise IndexError(f"custom_id 越界: {i}")
+        except (ValueError, TypeError, KeyError, IndexError, AttributeError) as e:
+            # 单行格式错误不影响其他结果，对应图片由调用方降级处理
+            print(f"    ⚠️  跳过无法解析的 Batch 结果: {type(e).__name__}: {e}")
+            continue
+        
+        usage = body.get("usage") or {}
+        get_stats().add(
+            usage.get("prompt_tokens", 0),
+            usage.get("completion_tokens", 0),
+            stage="stage5_analyze_images",
+            model=body.get("model", settings.vision_model),
+        )
+        
+        task = tasks[i]
+        results[i] = _description_from_content(
+            content,
+            task['frame'].timestamp,
+            task['frame_path'],
+            task['context'],
+        )
+    return results
+
+
+def _wait_for_batch(client: OpenAI, batch_id: str, max_interval: float = 300.0):
+    """轮询 Batch 任务直到结束 (间隔指数增长，最长 max_interval 秒)."""
+    interval = 5.0
+    while True:
+        batch = client.batches.retrieve(batch_id)
+        if batch.status in ("completed", "failed", "expired", "cancelled"):
+            return batch
+        time.sleep(interval)
+        interval = min(interval * 2, max_interval)
+
+
+def _analyze_image_batch(
+    client: OpenAI,
+    tasks: list[dict],
+    images: list[bytes | str],
+) -> list[ImageDescription]:
+    """单次请求分析多张图片 (system prompt 只发送一次).
+    
+    Raises:
+        ValueError: 响应无法解析为与图片一一对应的 JSON 数组
+    """
+    prompt_path = settings.prompts_dir / "image_analysis_batch.md"
+    if not prompt_path.exists():
+        raise FileNotFoundError(f"Prompt 文件不存在: {prompt_path}")
+    
+    system_msg, user_template, api_params = load_prompt_with_meta(prompt_path)
+    
+    # 文本说明 + 每张图片的 (编号/上下文, 图片) 交替排列
+    content = [{"type": "text", "text": user_template.format(count=len(tasks))}]
+    for i, (task, image) in enumerate(zip(tasks, images), 1):
+        content.append({
+            "type": "text",
+            "text": f"[图片 {i} @ {task['frame'].timestamp:.1f}s] 视频上下文：{task['context'][:500]}",
+        })
+        content.append(_image_part(image))
+    
+    request = {
+        "model": settings.vision_model,
+        "messages": [
+            {"role": "system", "content": system_msg},
+            {"role": "user", "content": content},
+        ],
+        **api_params,
+    }
+    items = _parse_batch_response(_completion_content(client, request))
+    if len(items) != len(tasks):
+        raise ValueError(f"返回 {len(items)} 条结果，期望 {len(tasks)} 条")
+    
+    descriptions = []
+    for task, item in zip(tasks, items):
+        descriptions.append(ImageDescription(
+            timestamp=task['frame'].timestamp,
+            image_path=task['frame_path'],
+            description=str(item.get("description", "")).strip(),
+            key_elements=[str(e) for e in item.get("key_elements", [])][:5],
+            related_transcript=task['context'],
+        ))
+    return descriptions
+
+
+def _parse_batch_response(content: str) -> list[dict]:
+    """解析多图分析响应 (JSON 数组，可能包裹在代码块中)."""
+    content = content.strip()
+    start = content.find("[")
+    end = content.rfind("]")
+    if start == -1 or end <= start:
+        raise ValueError("响应中没有 JSON 数组")
+    
+    items = orjson.loads(content[start:end + 1])
+    if not all(isinstance(item, dict) for item in items):
+        raise ValueError("JSON 数组元素格式错误")
+    
+    # 按 index 排序（模型可能乱序返回）
+    return sorted(items, key=lambda item: item.get("index", 0))
+
+
+def _encode_image(image: bytes | memoryview | str) -> str:
+    """将 JPEG 字节编码为 data URL (字节拼接后一次解码)，URL 原样返回."""
+    if isinstance(image, str):
+        return image
+    return (b"data:image/jpeg;base64," + base64.b64encode(image)).decode("ascii")
+
+
+def _image_part(image: bytes | str) -> dict:
+    """构造消息中的图片部分 (按配置附带 detail 档位)."""
+    image_url = {"url": _encode_image(image)}
+    if settings.vision_image_detail:
+        image_url["detail"] = settings.vision_image_detail
+    return {"type": "image_url", "image_url": image_url}
+
+
+def _frame_url(url_prefix: str, frame_path: Path) -> str:
+    """帧图片的公网 URL (帧目录发布在 url_prefix 下)."""
+    return f"{url_prefix}/{frame_path.name}"
+
+
 def _print_usage_info(response, stage: str = "") -> None:
     """打印 API 用量和价格信息，并更新全局统计."""
     if not hasattr(response, 'usage') or response.usage is None:
@@ -284,19 +684,8 @@ def _print_usage_info(response, stage: str = "") -> None:
 
 
 def _extract_key_elements(text: str) -> list[str]:
-    """从描述中提取关键元素."""
-    # 简单提取：寻找关键词或列表项
-    elements = []
-    
-    # 检查是否有列表格式
-    lines = text.split("\n")
-    for line in lines:
-        line = line.strip()
-        # 提取以 - 或数字开头的列表项
-        if line.startswith("-") or line.startswith("•"):
-            elements.append(line[1:].strip())
-    
-    return elements[:5]  # 最多 5 个
+    """从描述中提取关键元素 (列表项)."""
+    return _KEY_ELEM_RE.findall(text)[:5]  # 最多 5 个
 
 
 # CLI 入口
@@ -10,17 +10,43 @@
     4. 生成最终文档结构
 """
 
-import json
+import re
 from pathlib import Path
 from typing import Optional
 
+import orjson
+from json_repair import repair_json
 from openai import OpenAI
 
 from video2markdown.config import settings
+from video2markdown.llm import api_slot, get_client
+from video2markdown.llm_cache import get_llm_cache, make_cache_key
 from video2markdown.models import (
     Chapter, Document, ImageDescriptions, KeyFrames, VideoTranscript
 )
-from video2markdown.stage5_analyze_images import _load_prompt_with_meta
+from video2markdown.prompts import load_prompt_with_meta
+from video2markdown.stats import get_stats
+
+# prompt 正文中静态前缀与动态输入的分隔标记
+_DYNAMIC_MARKER = "<!-- dynamic -->"
+
+# 模板变量 {name} 与转义的 {{ / }}，一次扫描完成替换
+_TEMPLATE_RE = re.compile(r"\{\{|\}\}|\{(\w+)\}")
+
+# markdown 代码块 (```json ... ``` 或 ``` ... ```)，未闭合时取到末尾
+_FENCE_RE = re.compile(r"```(?:json)?(.*?)(?:```|\Z)", re.DOTALL)
+
+# AI 响应中章节字段的默认值 (缺失的字段使用默认值，多余的字段忽略)
+_CHAPTER_DEFAULTS = {
+    "title": "",
+    "start_time": "00:00:00",
+    "end_time": "00:00:00",
+    "summary": "",
+    "key_points": (),
+    "cleaned_transcript": "",
+    "visual_timestamp": None,
+    "visual_reason": None,
+}
 
 
 def generate_document(
@@ -46,17 +72,15 @@ def generate_document(
     
     # Stage 6 使用更长的超时（15分钟），因为长视频的文档生成可能需要较长时间
     timeout_seconds = 900.0
-    client = OpenAI(**settings.get_client_kwargs(timeout=timeout_seconds))
+    client = get_client(timeout=timeout_seconds)
     doc_title = title or transcript.title
     
     # 准备输入数据
     input_data = _prepare_input(transcript, keyframes, descriptions)
     
-    from video2markdown.progress import HeartbeatMonitor
-    
     # 日志：请求前信息
     m1_text_length = len(input_data["m1_text"])
-    images_count = len(input_data["images"])
+    images_count = len(descriptions.descriptions)
     print(f"  📊 请求信息:")
     print(f"     M1 文稿长度: {m1_text_length:,} 字符")
     print(f"     配图数量: {images_count} 张")
@@ -70,41 +94,189 @@ def generate_document(
     if not prompt_path.exists():
         raise FileNotFoundError(f"Prompt 文件不存在: {prompt_path}")
     
-    system_msg, user_template, api_params = _load_prompt_with_meta(prompt_path)
-    
-    # 填充模板变量（使用安全替换，避免 JSON 中的 { 被当作格式标记）
-    user_content = user_template
-    user_content = user_content.replace("{title}", input_data["title"])
-    user_content = user_content.replace("{m1_text}", input_data["m1_text"])
-    user_content = user_content.replace("{images}", json.dumps(input_data["images"], ensure_ascii=False))
+    system_msg, user_template, api_params = load_prompt_with_meta(prompt_path)
+    # JSON 模式约束模型输出合法 JSON (prompt 未配置时默认开启)
+    api_params.setdefault("response_format", {"type": "json_object"})
+    
+    # 静态前缀（说明/输出格式）原样单独发送，跨视频保持字节一致以命中 prompt 缓存；
+    # 变量只填充到动态尾部
+    static_prefix, marker, user_template = user_template.partition(_DYNAMIC_MARKER)
+    if not marker:
+        static_prefix, user_template = "", static_prefix
+    static_prefix = _fill_template(static_prefix.strip())
+    
+    # 填充模板变量（单次扫描；替换值中的 { 不会被再次解析）
+    user_content = _fill_template(
+        user_template.strip(),
+        title=input_data["title"],
+        m1_text=input_data["m1_text"],
+        images=input_data["images_json"],
+    )
     
     # 日志：请求体大小
-    request_size = len(system_msg) + len(user_content)
+    request_size = len(system_msg) + len(static_prefix) + len(user_content)
     print(f"     请求体大小: {request_size:,} 字符 (~{request_size//4:,} tokens 预估)")
     
+    messages = [{"role": "system", "content": system_msg}]
+    if static_prefix:
+        messages.append({"role": "user", "content": static_prefix})
+    messages.append({"role": "user", "content": user_content})
+    
+    # 响应缓存（同一请求重跑时跳过 API 调用）
+    cache = get_llm_cache()
+    cache_key = make_cache_key(settings.model, messages, api_params) if cache else ""
+    cached = cache.get(cache_key) if cache else None
+    
+    if cached is not None:
+        print(f"     📦 命中响应缓存，跳过 API 调用 ({cache_key[:12]})")
+        content = cached["content"]
+        original = cached.get("usage") or {}
+        if original:
+            print(f"     原始用量: {original.get('total_tokens', 0):,} tokens (本次不计费)")
+        # 命中缓存按 0 token 计入统计，重跑时本阶段仍出现在用量明细中
+        get_stats().add(0, 0, stage="stage6_generate")
+    else:
+        content, usage_chunk = _stream_completion(client, messages, api_params)
+        
+        # 显示 Token 用量和价格
+        _print_usage_info(usage_chunk, stage="stage6_generate")
+        
+        if cache:
+            cache.set(cache_key, {"content": content, "usage": _usage_dict(usage_chunk)})
+    
+    # 解析完整响应 (以完整解析结果为准)
+    doc_data = _parse_response(content)
+    
+    # 创建 Document
+    chapters = [_chapter_from_dict(i, ch) for i, ch in enumerate(doc_data.get("chapters", []), 1)]
+    
+    print(f"  ✓ 生成 {len(chapters)} 个章节")
+    
+    return Document(
+        title=doc_data.get("title", doc_title),
+        chapters=chapters,
+    )
+
+
+def _chapter_from_dict(i: int, ch: dict) -> Chapter:
+    """由 AI 响应中的章节对象构造 Chapter (缺失字段使用默认值)."""
+    fields = {**_CHAPTER_DEFAULTS, **{k: ch[k] for k in _CHAPTER_DEFAULTS.keys() & ch.keys()}}
+    if "title" not in ch:
+        fields["title"] = f"章节 {i}"
+    # 只复制真正的序列；null 视为空，单个字符串视为一条要点 (不拆成单字)
+    key_points = fields["key_points"]
+    if isinstance(key_points, (list, tuple)):
+        fields["key_points"] = list(key_points)
+    else:
+        fields["key_points"] = [key_points] if isinstance(key_points, str) and key_points else []
+    return Chapter(id=i, **fields)
+
+
+def _fill_template(template: str, **values: str) -> str:
+    """填充 {name} 变量并还原 {{ }} 转义，未知变量保持原样."""
+    def replace(match: re.Match) -> str:
+        name = match.group(1)
+        if name is None:
+            return match.group(0)[0]  # {{ -> {, }} -> }
+        return values.get(name, match.group(0))
+    
+    return _TEMPLATE_RE.sub(replace, template)
+
+
+class _ChapterStreamScanner:
+    """增量扫描流式 JSON，检测 chapters 数组中已完整的章节对象.
+    
+    结构: {"title": ..., "chapters": [{...}, {...}]}
+    顶层对象深度 1，chapters 数组深度 2，章节对象深度 3。
+    """
+    
+    def __init__(self):
+        self.count = 0
+        self._pending = []  # 当前未完成章节已接收的文本片段
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._in_chapter = False
+    
+    def feed(self, text: str) -> list[dict]:
+        """追加文本，返回本次新完成的章节."""
+        done = []
+        start = 0 if self._in_chapter else None  # 当前章节在 text 中的起始位置
+        for i, c in enumerate(text):
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif c == "\\":
+                    self._escape = True
+                elif c == '"':
+                    self._in_string = False
+                continue
+            
+            if c == '"':
+                self._in_string = True
+            elif c in "{[":
+                self._depth += 1
+                if self._depth == 3 and c == "{":
+                    self._in_chapter = True
+                    start = i
+            elif c in "}]":
+                if self._depth == 3 and c == "}" and self._in_chapter:
+                    self._pending.append(text[start:i + 1])
+                    try:
+                        done.append(orjson.loads("".join(self._pending)))
+                        self.count += 1
+                    except orjson.JSONDecodeError:
+                        pass
+                    # 已完成的章节不再保留
+                    self._pending.clear()
+                    self._in_chapter = False
+                    start = None
+                self._depth -= 1
+        
+        # 只保留未完成章节的文本切片，不逐字符缓存
+        if self._in_chapter:
+            self._pending.append(text[start:])
+        return done
+
+
+def _stream_completion(client: OpenAI, messages: list[dict], api_params: dict):
+    """流式调用文档生成 API，返回 (完整响应文本, 含用量的最后一个 chunk)."""
+    from video2markdown.progress import HeartbeatMonitor
+    
     # 调用 AI - 任务是在 M1 的合适位置插入配图
     import time
     start_time = time.time()
     print(f"     🕐 请求开始: {time.strftime('%H:%M:%S')}")
     
+    # 流式接收：边生成边解析，章节一完成即输出进度
+    scanner = _ChapterStreamScanner()
+    parts = []
+    usage_chunk = None
     try:
-        with HeartbeatMonitor("AI文档生成", interval=10):
-            response = client.chat.completions.create(
+        with HeartbeatMonitor("AI文档生成", interval=10), api_slot():
+            stream = client.chat.completions.create(
                 model=settings.model,
-                messages=[
-                    {
-                        "role": "system", 
-                        "content": system_msg
-                    },
-                    {
-                        "role": "user",
-                        "content": user_content
-                    }
-                ],
+                messages=messages,
+                stream=True,
+                stream_options={"include_usage": True},
                 **api_params,
             )
+            for chunk in stream:
+                if chunk.usage is not None:
+                    usage_chunk = chunk  # 用量在最后一个 chunk 中
+                if not chunk.choices:
+                    continue
+                delta = chunk.choices[0].delta.content
+                if not delta:
+                    continue
+                parts.append(delta)
+                for ch in scanner.feed(delta):
+                    print(f"     📄 章节 {scanner.count}: {ch.get('title', '')}")
         elapsed = time.time() - start_time
         print(f"     ✅ 请求成功: {elapsed:.1f}s")
+        if usage_chunk is None:
+            # 部分服务商忽略 stream_options.include_usage，此时本次调用不计入用量统计
+            print(f"     ⚠️  流式响应未返回 Token 用量，本次调用未计入统计")
     except Exception as e:
         elapsed = time.time() - start_time
         print(f"     ❌ 请求失败: {elapsed:.1f}s")
@@ -112,35 +284,19 @@ def generate_document(
         print(f"     ❌ 错误信息: {str(e)}")
         raise
     
-    # 显示 Token 用量和价格
-    _print_usage_info(response, stage="stage6_generate")
-    
-    # 解析响应
-    content = response.choices[0].message.content
-    doc_data = _parse_response(content)
-    
-    # 创建 Document
-    chapters = []
-    for i, ch in enumerate(doc_data.get("chapters", []), 1):
-        chapter = Chapter(
-            id=i,
-            title=ch.get("title", f"章节 {i}"),
-            start_time=ch.get("start_time", "00:00:00"),
-            end_time=ch.get("end_time", "00:00:00"),
-            summary=ch.get("summary", ""),
-            key_points=ch.get("key_points", []),
-            cleaned_transcript=ch.get("cleaned_transcript", ""),
-            visual_timestamp=ch.get("visual_timestamp"),
-            visual_reason=ch.get("visual_reason"),
-        )
-        chapters.append(chapter)
-    
-    print(f"  ✓ 生成 {len(chapters)} 个章节")
-    
-    return Document(
-        title=doc_data.get("title", doc_title),
-        chapters=chapters,
-    )
+    return "".join(parts), usage_chunk
+
+
+def _usage_dict(response) -> dict:
+    """提取响应中的 Token 用量 (随缓存保存，无用量时为空字典)."""
+    usage = getattr(response, "usage", None)
+    if usage is None:
+        return {}
+    return {
+        "prompt_tokens": getattr(usage, "prompt_tokens", 0),
+        "completion_tokens": getattr(usage, "completion_tokens", 0),
+        "total_tokens": getattr(usage, "total_tokens", 0),
+    }
 
 
 def _print_usage_info(response, stage: str = "") -> None:
@@ -157,7 +313,6 @@ def _print_usage_info(response, stage: str = "") -> None:
         return
     
     # 更新全局统计
-    from video2markdown.stats import get_stats
     get_stats().add(prompt_tokens, completion_tokens, stage=stage)
     
     # 从配置获取价格
@@ -178,66 +333,57 @@ def _prepare_input(
     descriptions: ImageDescriptions,
 ) -> dict:
     """准备 AI 输入数据."""
-    # 配图信息
-    images_data = []
-    for desc in descriptions.descriptions:
-        images_data.append({
-            "timestamp": desc.timestamp,
-            "description": desc.description,
-            "key_elements": desc.key_elements,
-        })
-    
     return {
         "title": transcript.title,
         "m1_text": transcript.optimized_text,  # 使用 AI 优化后的文稿
-        "images": images_data,
+        "images_json": descriptions.to_llm_images_json(),  # 配图信息 (已序列化)
     }
 
 
 def _parse_response(content: str) -> dict:
     """解析 AI 响应，增强错误处理."""
-    import re
+    # 快速路径：JSON 模式下响应即为合法 JSON
+    if content.lstrip().startswith("{"):
+        try:
+            return orjson.loads(content)
+        except orjson.JSONDecodeError:
+            pass
     
+    # 回退：模型未遵守 response_format 时，处理代码块等包裹
     original_content = content.strip()
     
     # 处理 markdown 代码块
-    if "```json" in content:
-        start = content.find("```json") + 7
-        end = content.find("```", start)
-        if end == -1:
-            end = len(content)
-        content = content[start:end].strip()
-    elif "```" in content:
-        start = content.find("```") + 3
-        end = content.find("```", start)
-        if end == -1:
-            end = len(content)
-        content = content[start:end].strip()
+    fence = _FENCE_RE.search(content)
+    if fence:
+        content = fence.group(1).strip()
     
     # 尝试解析 JSON
     try:
-        return json.loads(content)
-    except json.JSONDecodeError as e:
+        return orjson.loads(content)
+    except orjson.JSONDecodeError as e:
         print(f"  ⚠️  JSON 解析失败: {e}")
         print(f"  尝试修复...")
         
-        # 尝试提取 JSON 对象（查找最外层的花括号内容）
-        try:
-            # 查找第一个 { 和最后一个 }
-            start_idx = content.find('{')
-            end_idx = content.rfind('}')
-            if start_idx != -1 and end_idx != -1 and start_idx < end_idx:
-                json_content = content[start_idx:end_idx+1]
-                return json.loads(json_content)
-        except Exception:
-            pass
+        # 提取第一个完整的 JSON 对象（括号配对，忽略前后说明文字）
+        json_content = _extract_json_object(content)
+        if json_content is not None:
+            try:
+                return orjson.loads(json_content)
+            except orjson.JSONDecodeError:
+                pass
+        
+        # 修复常见格式错误（尾随逗号、单引号、输出被截断等）
+        start_idx = content.find("{")
+        if start_idx != -1:
+            repaired = repair_json(json_content or content[start_idx:], return_objects=True)
+            if isinstance(repaired, dict) and repaired:
+                print(f"  ✓ JSON 修复成功")
+                return repaired
         
         # 如果仍然失败，返回一个基本的结构
         print(f"  ⚠️  无法解析 AI 响应，使用默认结构")
         # 保存原始响应用于调试
-        debug_path = Path("test_outputs/temp/stage6_debug_response.txt")
-        debug_path.parent.mkdir(parents=True, exist_ok=True)
-        debug_path.write_text(original_content, encoding="utf-8")
+        debug_path = _dump_debug_response(original_content)
         print(f"  原始响应已保存到: {debug_path}")
         
         return {
@@ -246,6 +392,53 @@ def _parse_response(content: str) -> dict:
         }
 
 
+
+def _dump_debug_response(content: str, head: int = 8192, tail: int = 4096) -> Path:
+    """保存解析失败的原始响应 (仅保留首尾，gzip 压缩，按内容哈希命名避免并发冲突)."""
+    import gzip
+    import hashlib
+    
+    digest = hashlib.sha256(content.encode("utf-8")).hexdigest()[:12]
+    debug_path = Path(f"test_outputs/temp/stage6_debug_{digest}.txt.gz")
+    debug_path.parent.mkdir(parents=True, exist_ok=True)
+    
+    if len(content) > head + tail:
+        omitted = len(content) - head - tail
+        content = f"{content[:head]}\n... (省略 {omitted:,} 字符) ...\n{content[-tail:]}"
+    with gzip.open(debug_path, "wt", encoding="utf-8") as f:
+        f.write(content)
+    return debug_path
+
+
+def _extract_json_object(text: str) -> Optional[str]:
+    """一次扫描找出第一个 { 及其配对的 }，返回该 JSON 对象文本 (不完整时返回 None)."""
+    start = text.find("{")
+    if start == -1:
+        return None
+    
+    depth = 0
+    in_string = False
+    escape = False
+    for i in range(start, len(text)):
+        c = text[i]
+        if in_string:
+            if escape:
+                escape = False
+            elif c == "\\":
+                escape = True
+            elif c == '"':
+                in_string = False
+        elif c == '"':
+            in_string = True
+        elif c == "{":
+            depth += 1
+        elif c == "}":
+            depth -= 1
+            if depth == 0:
+                return text[start:i + 1]
+    return None
+
+
 # CLI 入口
 if __name__ == "__main__":
     import sys
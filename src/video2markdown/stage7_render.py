@@ -16,10 +16,13 @@
         └── summary.md       # 处理汇总报告
 """
 
+import os
 import shutil
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Optional
+from typing import Optional, TextIO
 
+from video2markdown.config import settings
 from video2markdown.models import Document, ImageDescriptions, VideoTranscript
 
 
@@ -56,24 +59,32 @@ def render_markdown(
         temp_dir = doc_dir / "temp"
     temp_dir.mkdir(parents=True, exist_ok=True)
     
-    # 1. 渲染主文档
-    main_doc = _render_main_document(document, descriptions)
     main_path = doc_dir / f"{document.title}.md"
-    main_path.write_text(main_doc, encoding="utf-8")
-    print(f"  ✓ 主文档: {main_path}")
-    
-    # 2. 保存文字稿到 temp/ 目录
     word_path = temp_dir / f"{document.title}_word.md"
-    word_path.write_text(transcript.to_word_document(), encoding="utf-8")
-    print(f"  ✓ 文字稿: {word_path}")
-    
-    # 3. 保存字幕到 temp/ 目录
     srt_path = temp_dir / f"{document.title}.srt"
-    srt_path.write_text(transcript.to_srt(), encoding="utf-8")
-    print(f"  ✓ 字幕: {srt_path}")
     
-    # 4. 复制配图和说明
-    _copy_frames_with_descriptions(descriptions, frames_dir)
+    def write_main() -> None:
+        with main_path.open("w", encoding="utf-8", buffering=1 << 20) as f:
+            _render_main_document(document, descriptions, f)
+    
+    # 四项输出互不依赖，并发执行
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        futures = [
+            # 1. 渲染主文档
+            executor.submit(write_main),
+            # 2. 保存文字稿到 temp/ 目录
+            executor.submit(lambda: word_path.write_text(transcript.to_word_document(), encoding="utf-8")),
+            # 3. 保存字幕到 temp/ 目录
+            executor.submit(lambda: srt_path.write_text(transcript.to_srt(), encoding="utf-8")),
+            # 4. 复制配图和说明
+            executor.submit(_copy_frames_with_descriptions, descriptions, frames_dir),
+        ]
+        for future in futures:
+            future.result()
+    
+    print(f"  ✓ 主文档: {main_path}")
+    print(f"  ✓ 文字稿: {word_path}")
+    print(f"  ✓ 字幕: {srt_path}")
     
     return main_path
 
@@ -81,90 +92,97 @@ def render_markdown(
 def _render_main_document(
     document: Document,
     descriptions: ImageDescriptions,
-) -> str:
-    """渲染主 Markdown 文档."""
-    lines = []
+    out: TextIO,
+) -> None:
+    """渲染主 Markdown 文档，逐行写入 out (不在内存中拼接整篇文档)."""
+    first = True
+    
+    def emit(line: str) -> None:
+        # 行间写换行符，输出与 "\n".join(lines) 一致
+        nonlocal first
+        if not first:
+            out.write("\n")
+        out.write(line)
+        first = False
     
     # 标题
-    lines.append(f"# {document.title}")
-    lines.append("")
-    lines.append("*AI 整理的视频内容*")
-    lines.append("")
+    emit(f"# {document.title}")
+    emit("")
+    emit("*AI 整理的视频内容*")
+    emit("")
     
     # 目录
-    lines.append("## 目录")
+    emit("## 目录")
     for ch in document.chapters:
         anchor = f"chapter-{ch.id}"
-        lines.append(f"{ch.id}. [{ch.title}](#{anchor})")
-    lines.append("")
-    lines.append("---")
-    lines.append("")
+        emit(f"{ch.id}. [{ch.title}](#{anchor})")
+    emit("")
+    emit("---")
+    emit("")
     
     # 章节内容
     for ch in document.chapters:
         anchor = f"chapter-{ch.id}"
-        lines.append(f"<a id='{anchor}'></a>")
-        lines.append(f"## {ch.id}. {ch.title}")
-        lines.append("")
-        lines.append(f"**时间:** [{ch.start_time} - {ch.end_time}]")
-        lines.append("")
+        emit(f"<a id='{anchor}'></a>")
+        emit(f"## {ch.id}. {ch.title}")
+        emit("")
+        emit(f"**时间:** [{ch.start_time} - {ch.end_time}]")
+        emit("")
         
         # 摘要
-        lines.append("### 内容摘要")
-        lines.append(ch.summary)
-        lines.append("")
+        emit("### 内容摘要")
+        emit(ch.summary)
+        emit("")
         
         # 关键要点
         if ch.key_points:
-            lines.append("### 关键要点")
+            emit("### 关键要点")
             for point in ch.key_points:
-                lines.append(f"- {point}")
-            lines.append("")
+                emit(f"- {point}")
+            emit("")
         
         # 配图 (如果有)
         if ch.visual_timestamp:
             desc = descriptions.get_by_timestamp(ch.visual_timestamp)
             if desc:
                 frame_file = desc.image_path.name
-                lines.append("### 相关画面")
+                emit("### 相关画面")
                 # 使用相对路径 images/ 目录，避免特殊字符和空格问题
-                lines.append(f"![{ch.visual_timestamp}s](images/{frame_file})")
-                lines.append("")
-                lines.append("**画面内容:**")
-                lines.append(f"> {desc.description}")
-                lines.append("")
+                emit(f"![{ch.visual_timestamp}s](images/{frame_file})")
+                emit("")
+                emit("**画面内容:**")
+                emit(f"> {desc.description}")
+                emit("")
                 if desc.key_elements:
-                    lines.append(f"**关键元素:** {', '.join(desc.key_elements)}")
-                    lines.append("")
+                    emit(f"**关键元素:** {', '.join(desc.key_elements)}")
+                    emit("")
         
         # 原文
         if ch.cleaned_transcript:
-            lines.append("### 原文记录")
-            lines.append("<details>")
-            lines.append("<summary>📄 查看原始转录</summary>")
-            lines.append("")
-            lines.append(ch.cleaned_transcript)
-            lines.append("</details>")
-            lines.append("")
+            emit("### 原文记录")
+            emit("<details>")
+            emit("<summary>📄 查看原始转录</summary>")
+            emit("")
+            emit(ch.cleaned_transcript)
+            emit("</details>")
+            emit("")
         
-        lines.append("---")
-        lines.append("")
-    
-    return "\n".join(lines)
+        emit("---")
+        emit("")
 
 
 def _copy_frames_with_descriptions(
     descriptions: ImageDescriptions,
     frames_dir: Path,
 ) -> None:
-    """复制配图和说明文件."""
-    for desc in descriptions.descriptions:
+    """复制配图和说明文件 (I/O 密集，线程池并发执行)."""
+    def copy_one(desc) -> None:
         if not desc.image_path.exists():
-            continue
+            return
         
-        # 复制图片
+        # 放置图片 (硬链接/reflink/移动/复制)
         dest_image = frames_dir / desc.image_path.name
-        shutil.copy2(desc.image_path, dest_image)
+        _place_frame(desc.image_path, dest_image, mode)
         
         # 保存说明
         desc_file = frames_dir / f"{desc.image_path.stem}.txt"
@@ -174,9 +192,60 @@ def _copy_frames_with_descriptions(
         desc_content += f"相关文字稿:\n{desc.related_transcript[:500]}..."
         desc_file.write_text(desc_content, encoding="utf-8")
     
+    mode = settings.stage7_frame_mode
+    max_workers = min(32, (os.cpu_count() or 1) * 4)
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        # list() 消费结果，使工作线程中的异常在此抛出
+        list(executor.map(copy_one, descriptions.descriptions))
+    
     print(f"  ✓ 配图: {frames_dir} ({len(descriptions.descriptions)} 张)")
 
 
+def _place_frame(src: Path, dest: Path, mode: str) -> None:
+    """将配图放入成果目录.
+    
+    mode:
+        link: 硬链接 (同一文件系统零拷贝)，失败时复制；成果与临时目录为同一文件，
+            原地修改任一处都会影响另一处
+        reflink: copy_file_range (btrfs/XFS 等由内核共享数据块)，失败时复制
+        move: 重命名移入 (临时目录中的原图随之移走)，跨设备时复制
+        copy: 普通复制 (默认)
+    """
+    if mode == "move":
+        try:
+            os.replace(src, dest)
+            return
+        except OSError:
+            pass  # 跨设备，回退复制
+    elif mode == "link":
+        try:
+            dest.unlink(missing_ok=True)
+            os.link(src, dest)
+            return
+        except OSError:
+            pass  # 跨设备或文件系统不支持，回退复制
+    elif mode == "reflink":
+        try:
+            _copy_file_range(src, dest)
+            shutil.copystat(src, dest)
+            return
+        except (OSError, AttributeError):
+            pass  # 非 Linux 或文件系统不支持，回退复制
+    
+    shutil.copy2(src, dest)
+
+
+def _copy_file_range(src: Path, dest: Path) -> None:
+    """使用 os.copy_file_range 在内核中复制文件 (不经过用户态缓冲区)."""
+    with open(src, "rb") as fsrc, open(dest, "wb") as fdst:
+        remaining = os.fstat(fsrc.fileno()).st_size
+        while remaining > 0:
+            copied = os.copy_file_range(fsrc.fileno(), fdst.fileno(), remaining)
+            if copied == 0:
+                break
+            remaining -= copied
+
+
 # CLI 入口
 if __name__ == "__main__":
     import sys
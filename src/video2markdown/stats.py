@@ -3,16 +3,19 @@
 用于收集和汇总各阶段的 API 用量和费用.
 """
 
-import json
+import io
+import threading
 from dataclasses import dataclass, field
 from datetime import datetime
 from pathlib import Path
 from typing import Any, Optional
 
+import orjson
+
 from video2markdown.config import settings
 
 
-@dataclass
+@dataclass(slots=True)
 class APICallRecord:
     """单次 API 调用记录."""
     stage: str
@@ -24,9 +27,19 @@ class APICallRecord:
     @property
     def total_tokens(self) -> int:
         return self.prompt_tokens + self.completion_tokens
+    
+    def to_dict(self) -> dict:
+        return {
+            "stage": self.stage,
+            "timestamp": self.timestamp,
+            "model": self.model,
+            "prompt_tokens": self.prompt_tokens,
+            "completion_tokens": self.completion_tokens,
+            "total_tokens": self.prompt_tokens + self.completion_tokens,
+        }
 
 
-@dataclass
+@dataclass(slots=True)
 class StageTiming:
     """单个阶段的耗时信息."""
     name: str
@@ -53,7 +66,7 @@ class StageTiming:
         }
 
 
-@dataclass
+@dataclass(slots=True)
 class ProcessingSummary:
     """处理汇总信息."""
     video_name: str = ""
@@ -86,43 +99,76 @@ class ProcessingSummary:
             if timing.name == name and not timing.end_time:
                 timing.end_time = datetime.now().isoformat()
                 break
+    
+    def to_dict(self) -> dict:
+        return {
+            "video_name": self.video_name,
+            "video_duration_seconds": self.video_duration,
+            "start_time": self.start_time,
+            "end_time": self.end_time,
+            "elapsed_seconds": self.elapsed_seconds,
+            "total_stages": self.total_stages,
+            "completed_stages": self.completed_stages,
+            "stage_timings": [t.to_dict() for t in self.stage_timings],
+        }
 
 
+@dataclass(slots=True)
 class UsageStats:
     """API 用量统计."""
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    api_calls: int = 0
+    records: list[APICallRecord] = field(default_factory=list)
+    summary: ProcessingSummary = field(default_factory=ProcessingSummary)
+    # 多线程并发调用 API 时保护计数与明细
+    _lock: threading.Lock = field(default_factory=threading.Lock, init=False, repr=False, compare=False)
+    # 价格配置快照 (¥/百万 tokens 与 ¥/token)，见 refresh_prices()；报告与费用计算均以此为准
+    _in_price_per_1m: float = field(default=0.0, init=False, repr=False, compare=False)
+    _out_price_per_1m: float = field(default=0.0, init=False, repr=False, compare=False)
+    _in_price: float = field(default=0.0, init=False, repr=False, compare=False)
+    _out_price: float = field(default=0.0, init=False, repr=False, compare=False)
+    # records 的字典形式，由传入的 records 初始化，随 add() 增量追加，to_dict() 直接复用
+    _records_serialized: list[dict] = field(init=False, repr=False, compare=False)
     
-    def __init__(self):
-        self.prompt_tokens: int = 0
-        self.completion_tokens: int = 0
-        self.api_calls: int = 0
-        self.records: list[APICallRecord] = []
-        self.summary: ProcessingSummary = ProcessingSummary()
+    def __post_init__(self) -> None:
+        self._records_serialized = [r.to_dict() for r in self.records]
+        self.refresh_prices()
+    
+    def refresh_prices(self) -> None:
+        """从 settings 重新读取单价 (运行时修改价格配置后调用)."""
+        self._in_price_per_1m = settings.llm_price_input_per_1m
+        self._out_price_per_1m = settings.llm_price_output_per_1m
+        self._in_price = self._in_price_per_1m / 1_000_000
+        self._out_price = self._out_price_per_1m / 1_000_000
     
     @property
     def input_price(self) -> float:
         """输入 token 单价 (¥/token)."""
-        return settings.llm_price_input_per_1m / 1_000_000
+        return self._in_price
     
     @property
     def output_price(self) -> float:
         """输出 token 单价 (¥/token)."""
-        return settings.llm_price_output_per_1m / 1_000_000
+        return self._out_price
     
     def add(self, prompt_tokens: int, completion_tokens: int, stage: str = "", model: str = "") -> None:
-        """添加一次 API 调用的用量."""
-        self.prompt_tokens += prompt_tokens
-        self.completion_tokens += completion_tokens
-        self.api_calls += 1
-        
-        # 记录明细
-        record = APICallRecord(
-            stage=stage or f"call_{self.api_calls}",
-            timestamp=datetime.now().isoformat(),
-            prompt_tokens=prompt_tokens,
-            completion_tokens=completion_tokens,
-            model=model or settings.model,
-        )
-        self.records.append(record)
+        """添加一次 API 调用的用量 (线程安全)."""
+        with self._lock:
+            self.prompt_tokens += prompt_tokens
+            self.completion_tokens += completion_tokens
+            self.api_calls += 1
+            
+            # 记录明细
+            record = APICallRecord(
+                stage=stage or f"call_{self.api_calls}",
+                timestamp=datetime.now().isoformat(),
+                prompt_tokens=prompt_tokens,
+                completion_tokens=completion_tokens,
+                model=model or settings.model,
+            )
+            self.records.append(record)
+            self._records_serialized.append(record.to_dict())
     
     def add_from_response(self, response, stage: str = "") -> None:
         """从 API 响应中提取用量信息."""
@@ -143,12 +189,12 @@ class UsageStats:
     @property
     def input_cost(self) -> float:
         """输入费用 (¥)."""
-        return self.prompt_tokens * self.input_price
+        return self.prompt_tokens * self._in_price
     
     @property
     def output_cost(self) -> float:
         """输出费用 (¥)."""
-        return self.completion_tokens * self.output_price
+        return self.completion_tokens * self._out_price
     
     @property
     def total_cost(self) -> float:
@@ -166,98 +212,84 @@ class UsageStats:
         return "\n".join(lines)
     
     def to_dict(self) -> dict[str, Any]:
-        """转换为字典（用于 JSON 序列化）."""
-        return {
-            "summary": {
-                "video_name": self.summary.video_name,
-                "video_duration_seconds": self.summary.video_duration,
-                "start_time": self.summary.start_time,
-                "end_time": self.summary.end_time,
-                "elapsed_seconds": self.summary.elapsed_seconds,
-                "total_stages": self.summary.total_stages,
-                "completed_stages": self.summary.completed_stages,
-                "stage_timings": [t.to_dict() for t in self.summary.stage_timings],
-            },
-            "pricing": {
-                "input_price_per_1m": settings.llm_price_input_per_1m,
-                "output_price_per_1m": settings.llm_price_output_per_1m,
-                "currency": "CNY",
-            },
-            "total": {
-                "api_calls": self.api_calls,
-                "prompt_tokens": self.prompt_tokens,
-                "completion_tokens": self.completion_tokens,
-                "total_tokens": self.total_tokens,
-                "input_cost": round(self.input_cost, 4),
-                "output_cost": round(self.output_cost, 4),
-                "total_cost": round(self.total_cost, 4),
-            },
-            "records": [
-                {
-                    "stage": r.stage,
-                    "timestamp": r.timestamp,
-                    "model": r.model,
-                    "prompt_tokens": r.prompt_tokens,
-                    "completion_tokens": r.completion_tokens,
-                    "total_tokens": r.total_tokens,
-                }
-                for r in self.records
-            ],
-        }
+        """转换为字典（用于 JSON 序列化），在锁内生成快照，不受并发 add() 影响."""
+        with self._lock:
+            return {
+                "summary": self.summary.to_dict(),
+                "pricing": {
+                    "input_price_per_1m": self._in_price_per_1m,
+                    "output_price_per_1m": self._out_price_per_1m,
+                    "currency": "CNY",
+                },
+                "total": {
+                    "api_calls": self.api_calls,
+                    "prompt_tokens": self.prompt_tokens,
+                    "completion_tokens": self.completion_tokens,
+                    "total_tokens": self.total_tokens,
+                    "input_cost": round(self.input_cost, 4),
+                    "output_cost": round(self.output_cost, 4),
+                    "total_cost": round(self.total_cost, 4),
+                },
+                "records": list(self._records_serialized),
+            }
     
     def save_json(self, path: Path) -> None:
         """保存为 JSON 文件."""
         path.parent.mkdir(parents=True, exist_ok=True)
-        with open(path, "w", encoding="utf-8") as f:
-            json.dump(self.to_dict(), f, ensure_ascii=False, indent=2)
+        path.write_bytes(orjson.dumps(self.to_dict(), option=orjson.OPT_INDENT_2))
     
     def generate_summary_md(self) -> str:
         """生成 summary.md 内容."""
-        lines = [
-            f"# 处理汇总报告",
-            "",
-            f"**视频**: {self.summary.video_name}",
-            f"**开始时间**: {self.summary.start_time}",
-            f"**结束时间**: {self.summary.end_time}",
-            f"**总耗时**: {self._format_duration(self.summary.elapsed_seconds)}",
-            "",
-            "## AI API 用量",
-            "",
-            f"- **API 调用**: {self.api_calls} 次",
-            f"- **Token 用量**: {self.prompt_tokens:,} 输入 / {self.completion_tokens:,} 输出 / {self.total_tokens:,} 总计",
-            f"- **预估费用**: ¥{self.total_cost:.4f}",
-            "",
-            "### 调用明细",
-            "",
-            "| 序号 | 阶段 | 模型 | 输入 | 输出 | 总计 |",
-            "|-----|-----|------|-----|-----|-----|",
-        ]
+        fmt = self._format_duration
+        buf = io.StringIO()
+        w = buf.write
+        
+        w(
+            "# 处理汇总报告\n"
+            "\n"
+            f"**视频**: {self.summary.video_name}\n"
+            f"**开始时间**: {self.summary.start_time}\n"
+            f"**结束时间**: {self.summary.end_time}\n"
+            f"**总耗时**: {fmt(self.summary.elapsed_seconds)}\n"
+            "\n"
+            "## AI API 用量\n"
+            "\n"
+            f"- **API 调用**: {self.api_calls} 次\n"
+            f"- **Token 用量**: {self.prompt_tokens:,} 输入 / {self.completion_tokens:,} 输出 / {self.total_tokens:,} 总计\n"
+            f"- **预估费用**: ¥{self.total_cost:.4f}\n"
+            "\n"
+            "### 调用明细\n"
+            "\n"
+            "| 序号 | 阶段 | 模型 | 输入 | 输出 | 总计 |\n"
+            "|-----|-----|------|-----|-----|-----|\n"
+        )
         
+        # 表格行直接写入缓冲区，不经中间列表
         for i, r in enumerate(self.records, 1):
-            lines.append(f"| {i} | {r.stage} | {r.model} | {r.prompt_tokens:,} | {r.completion_tokens:,} | {r.total_tokens:,} |")
+            w(f"| {i} | {r.stage} | {r.model} | {r.prompt_tokens:,} | {r.completion_tokens:,} | {r.total_tokens:,} |\n")
         
-        lines.extend([
-            "",
-            "## 阶段耗时",
-            "",
-            "| 阶段 | 耗时 |",
-            "|-----|-----|",
-        ])
+        w(
+            "\n"
+            "## 阶段耗时\n"
+            "\n"
+            "| 阶段 | 耗时 |\n"
+            "|-----|-----|\n"
+        )
         
         for timing in self.summary.stage_timings:
-            lines.append(f"| {timing.name} | {self._format_duration(timing.elapsed_seconds)} |")
+            w(f"| {timing.name} | {fmt(timing.elapsed_seconds)} |\n")
         
-        lines.extend([
-            "",
-            f"**总耗时**: {self._format_duration(self.summary.elapsed_seconds)}",
-            "",
-            "## 价格配置",
-            "",
-            f"- 输入: ¥{settings.llm_price_input_per_1m} / 百万 tokens",
-            f"- 输出: ¥{settings.llm_price_output_per_1m} / 百万 tokens",
-        ])
+        w(
+            "\n"
+            f"**总耗时**: {fmt(self.summary.elapsed_seconds)}\n"
+            "\n"
+            "## 价格配置\n"
+            "\n"
+            f"- 输入: ¥{self._in_price_per_1m} / 百万 tokens\n"
+            f"- 输出: ¥{self._out_price_per_1m} / 百万 tokens"
+        )
         
-        return "\n".join(lines)
+        return buf.getvalue()
     
     def save_summary_md(self, path: Path) -> None:
         """保存 summary.md 文件."""
@@ -275,11 +307,13 @@ class UsageStats:
     
     def reset(self) -> None:
         """重置统计."""
-        self.prompt_tokens = 0
-        self.completion_tokens = 0
-        self.api_calls = 0
-        self.records = []
-        self.summary = ProcessingSummary()
+        with self._lock:
+            self.prompt_tokens = 0
+            self.completion_tokens = 0
+            self.api_calls = 0
+            self.records = []
+            self._records_serialized = []
+            self.summary = ProcessingSummary()
 
 
 # 全局统计实例
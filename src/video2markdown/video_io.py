@@ -0,0 +1,122 @@
+"""视频读取工具.
+
+统一创建 cv2.VideoCapture，集中应用解码参数；
+按线程缓存已打开的视频，避免逐帧读取时反复打开容器 (解析 moov 等)。
+"""
+
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator, Optional
+
+import cv2
+import numpy as np
+
+# 目标帧位于当前位置之后且不超过该时长时，顺序解码前进而不是 seek
+# (seek 需回退到前一个关键帧再解码，帧间距小时不如直接向前读)
+_FORWARD_READ_SEC = 2.0
+
+_local = threading.local()
+_opened: list[tuple[dict, str, cv2.VideoCapture]] = []  # 所有线程已打开的视频
+_opened_lock = threading.Lock()
+
+
+def open_capture(video_path: Path) -> cv2.VideoCapture:
+    """打开视频文件.
+    
+    settings.decode_threads > 0 时限制 FFmpeg 解码线程数，
+    避免多个解码器并发时各自按核数开线程导致过度订阅；
+    settings.hw_decode 开启时优先尝试硬件解码。
+    
+    调用方负责检查 isOpened() 并 release()。
+    """
+    from video2markdown.config import settings
+    
+    params = []
+    if settings.decode_threads > 0:
+        params += [cv2.CAP_PROP_N_THREADS, settings.decode_threads]
+    
+    if settings.hw_decode:
+        # 硬件解码 (VAAPI/NVDEC/D3D11 等，由 OpenCV 自动选择)，不可用时回退软件解码
+        cap = cv2.VideoCapture(
+            str(video_path),
+            cv2.CAP_ANY,
+            params + [cv2.CAP_PROP_HW_ACCELERATION, cv2.VIDEO_ACCELERATION_ANY],
+        )
+        if cap.isOpened():
+            return cap
+        cap.release()
+    
+    return cv2.VideoCapture(str(video_path), cv2.CAP_ANY, params)
+
+
+def get_capture(video_path: Path) -> cv2.VideoCapture:
+    """获取当前线程缓存的 VideoCapture (同一视频复用，不要 release).
+    
+    Raises:
+        RuntimeError: 无法打开视频
+    """
+    key = str(Path(video_path).resolve())
+    cache = getattr(_local, "captures", None)
+    if cache is None:
+        cache = _local.captures = {}
+    
+    cap = cache.get(key)
+    if cap is None:
+        cap = open_capture(video_path)
+        if not cap.isOpened():
+            raise RuntimeError(f"无法打开视频: {video_path}")
+        cache[key] = cap
+        with _opened_lock:
+            _opened.append((cache, key, cap))
+    return cap
+
+
+def release_captures() -> None:
+    """释放所有线程缓存的 VideoCapture (阶段结束、不再读帧时调用)."""
+    with _opened_lock:
+        for cache, key, cap in _opened:
+            cache.pop(key, None)
+            cap.release()
+        _opened.clear()
+
+
+@contextmanager
+def capture_scope() -> Iterator[None]:
+    """读帧作用域：退出时 (包括异常退出) 释放期间缓存的 VideoCapture.
+    
+    用法:
+        with capture_scope():
+            for ts in timestamps:
+                frame = read_frame_at(get_capture(video_path), ts)
+    """
+    try:
+        yield
+    finally:
+        release_captures()
+
+
+def read_frame_at(
+    cap: cv2.VideoCapture,
+    timestamp: float,
+    frame_buf: Optional[np.ndarray] = None,
+) -> Optional[np.ndarray]:
+    """读取指定时间点的帧，读取失败返回 None.
+    
+    按时间顺序读取多帧时，相邻目标帧间距较小则沿当前位置 grab() 前进，
+    整个过程退化为一次顺序解码；间距较大或需要回退时才 seek。
+    传入 frame_buf 时解码结果直接写入该缓冲区 (下次读取会覆盖)。
+    """
+    fps = cap.get(cv2.CAP_PROP_FPS)
+    frame_idx = int(timestamp * fps)
+    gap = frame_idx - int(cap.get(cv2.CAP_PROP_POS_FRAMES))
+    
+    if 0 <= gap <= fps * _FORWARD_READ_SEC:
+        for _ in range(gap):
+            if not cap.grab():
+                return None
+    else:
+        cap.set(cv2.CAP_PROP_POS_FRAMES, frame_idx)
+    
+    ret, frame = cap.read(frame_buf)
+    return frame if ret else None
@@ -19,11 +19,16 @@ Usage:
 """
 
 import json
+import os
 import shutil
 from pathlib import Path
 
 import pytest
 
+# video2markdown.config builds a module-level Settings on import, which requires
+# an API key; unit tests never call the real API, so a placeholder is enough.
+os.environ.setdefault("VIDEO2MD_API_KEY", "test-key")
+
 # Project root directory
 PROJECT_ROOT = Path(__file__).parent.parent
 TESTDATA_DIR = PROJECT_ROOT / "testdata"
@@ -0,0 +1,102 @@
+"""Unit tests for LLM response cache.
+
+测试响应缓存的键计算、文件后端读写与开关。
+"""
+
+import pytest
+
+from video2markdown.config import settings
+from video2markdown.llm_cache import FileCacheBackend, get_llm_cache, make_cache_key
+
+
+MESSAGES = [
+    {"role": "system", "content": "你是一位助手。"},
+    {"role": "user", "content": "你好"},
+]
+
+
+class TestMakeCacheKey:
+    """测试缓存键."""
+    
+    def test_deterministic(self):
+        """相同请求得到相同的键."""
+        key = make_cache_key("kimi-k2.5", MESSAGES, {"temperature": 1})
+        
+        assert key == make_cache_key("kimi-k2.5", MESSAGES, {"temperature": 1})
+        assert len(key) == 64
+    
+    def test_param_order_independent(self):
+        """参数字典的键顺序不影响结果."""
+        a = make_cache_key("m", MESSAGES, {"temperature": 1, "max_tokens": 100})
+        b = make_cache_key("m", MESSAGES, {"max_tokens": 100, "temperature": 1})
+        
+        assert a == b
+    
+    @pytest.mark.parametrize(
+        "model,messages,params",
+        [
+            ("other-model", MESSAGES, {"temperature": 1}),
+            ("kimi-k2.5", MESSAGES[:1], {"temperature": 1}),
+            ("kimi-k2.5", MESSAGES, {"temperature": 0}),
+        ],
+    )
+    def test_differs_on_any_change(self, model, messages, params):
+        """模型、消息或参数任一不同，键都不同."""
+        base = make_cache_key("kimi-k2.5", MESSAGES, {"temperature": 1})
+        
+        assert make_cache_key(model, messages, params) != base
+
+
+class TestFileCacheBackend:
+    """测试文件缓存后端."""
+    
+    def test_get_missing(self, tmp_path):
+        """未写入的键返回 None."""
+        cache = FileCacheBackend(tmp_path / "llm")
+        
+        assert cache.get("missing") is None
+    
+    def test_set_then_get(self, tmp_path):
+        """写入后可读回，且不留下临时文件."""
+        cache = FileCacheBackend(tmp_path / "llm")
+        cache.set("k", {"content": "响应文本", "usage": None})
+        
+        assert cache.get("k") == {"content": "响应文本", "usage": None}
+        assert [p.name for p in (tmp_path / "llm").iterdir()] == ["k.json"]
+    
+    def test_overwrite(self, tmp_path):
+        """重复写入覆盖旧值."""
+        cache = FileCacheBackend(tmp_path / "llm")
+        cache.set("k", {"content": "旧"})
+        cache.set("k", {"content": "新"})
+        
+        assert cache.get("k") == {"content": "新"}
+    
+    def test_corrupt_file(self, tmp_path):
+        """损坏的缓存文件视为未命中."""
+        cache = FileCacheBackend(tmp_path / "llm")
+        (tmp_path / "llm" / "k.json").write_bytes(b"{not json")
+        
+        assert cache.get("k") is None
+
+
+class TestGetLLMCache:
+    """测试缓存开关."""
+    
+    def test_disabled_by_default(self, monkeypatch, tmp_path):
+        """未开启 llm_cache 时不缓存 (temperature 为 0 也不缓存)."""
+        monkeypatch.setattr(settings, "llm_cache", False)
+        monkeypatch.setattr(settings, "temp_dir", tmp_path)
+        
+        assert get_llm_cache() is None
+        assert not (tmp_path / "cache").exists()
+    
+    def test_enabled(self, monkeypatch, tmp_path):
+        """开启后返回位于 temp_dir/cache/llm 的文件后端."""
+        monkeypatch.setattr(settings, "llm_cache", True)
+        monkeypatch.setattr(settings, "temp_dir", tmp_path)
+        
+        cache = get_llm_cache()
+        
+        assert isinstance(cache, FileCacheBackend)
+        assert cache.cache_dir == tmp_path / "cache" / "llm"
@@ -1,6 +1,8 @@
 """Unit tests for data models.
 
 测试 M1/M2/M3 数据模型的基本功能。
+
+PYTEST_DONT_REWRITE: 断言都很简单，跳过 pytest 断言重写。
 """
 
 import json
@@ -23,13 +25,19 @@ from video2markdown.models import (
 class TestTranscriptSegment:
     """测试转录片段."""
     
-    def test_to_srt_time(self):
+    @pytest.mark.parametrize(
+        "secs,expected",
+        [
+            (0, "00:00:00,000"),
+            (5.5, "00:00:05,500"),
+            (3661.123, "01:01:01,123"),
+        ],
+    )
+    def test_to_srt_time(self, secs, expected):
         """测试 SRT 时间格式转换."""
         seg = TranscriptSegment(start=0, end=5.5, text="Hello")
         
-        assert seg.to_srt_time(0) == "00:00:00,000"
-        assert seg.to_srt_time(5.5) == "00:00:05,500"
-        assert seg.to_srt_time(3661.123) == "01:01:01,123"
+        assert seg.to_srt_time(secs) == expected
     
     def test_to_srt_entry(self):
         """测试 SRT 条目生成."""
@@ -101,6 +109,67 @@ class TestVideoTranscript:
         text = transcript.get_text_around(7.0, window=3.0)
         assert "第二段" in text
         assert "第三段" not in text
+    
+    @staticmethod
+    def _make_transcript(spans: list[tuple[float, float]]) -> VideoTranscript:
+        return VideoTranscript(
+            video_path=Path("test.mp4"),
+            title="Test",
+            language="zh",
+            segments=[
+                TranscriptSegment(start=start, end=end, text=f"s{i}")
+                for i, (start, end) in enumerate(spans)
+            ],
+            optimized_text="",
+        )
+    
+    @staticmethod
+    def _expected_text(transcript: VideoTranscript, timestamp: float, window: float) -> str:
+        """逐段扫描的参考实现."""
+        return " ".join(
+            seg.text for seg in transcript.segments
+            if seg.start <= timestamp + window and seg.end >= timestamp - window
+        )
+    
+    @pytest.mark.parametrize(
+        "spans",
+        [
+            [(0, 5), (3, 8), (4, 6), (7, 12), (20, 25)],  # 重叠片段
+            [(0, 100), (5, 6), (10, 11), (50, 51), (90, 91)],  # 长片段跨越多个窗口
+            [(20, 25), (0, 5), (10, 15), (5, 10)],  # 未按开始时间排序
+            [(0, 5), (0, 2), (0, 9), (9, 9)],  # 开始时间相同 / 零时长
+            [],  # 空文字稿
+        ],
+        ids=["overlapping", "long_spanning", "unsorted", "ties", "empty"],
+    )
+    def test_get_text_around_matches_linear_scan(self, spans):
+        """二分查找结果与逐段扫描一致 (单点与批量)."""
+        transcript = self._make_transcript(spans)
+        timestamps = [-10.0, 0.0, 2.5, 7.0, 15.0, 30.0, 55.0, 95.0, 200.0]
+        expected = [self._expected_text(transcript, t, 3.0) for t in timestamps]
+        
+        assert [transcript.get_text_around(t, window=3.0) for t in timestamps] == expected
+        assert transcript.get_texts_around(timestamps, window=3.0) == expected
+    
+    def test_get_text_around_long_segment(self):
+        """开始很早但跨越查询时间点的长片段不会被跳过."""
+        transcript = self._make_transcript([(0, 100), (10, 11), (50, 51)])
+        
+        assert transcript.get_text_around(80.0, window=3.0) == "s0"
+    
+    def test_get_text_around_after_mutation(self):
+        """片段被原地修改或等长替换后，结果反映最新内容."""
+        transcript = self._make_transcript([(0, 5), (5, 10), (20, 25)])
+        assert transcript.get_text_around(22.0, window=1.0) == "s2"
+        
+        # 原地修改片段时间
+        transcript.segments[0].start, transcript.segments[0].end = 21.0, 23.0
+        assert transcript.get_text_around(22.0, window=1.0) == "s0 s2"
+        
+        # 替换为长度相同的另一个片段
+        transcript.segments[2] = TranscriptSegment(start=40, end=45, text="new")
+        assert transcript.get_text_around(22.0, window=1.0) == "s0"
+        assert transcript.get_text_around(42.0, window=1.0) == "new"
 
 
 class TestKeyFrames:
@@ -155,6 +224,24 @@ class TestImageDescriptions:
         # 找不到
         not_found = descs.get_by_timestamp(100.0)
         assert not_found is None
+    
+    def test_to_llm_images_json_reflects_mutation(self):
+        """配图 JSON 始终按当前描述序列化."""
+        descs = ImageDescriptions([
+            ImageDescription(
+                timestamp=10.0,
+                image_path=Path("frame1.jpg"),
+                description="描述1",
+                key_elements=["A"],
+                related_transcript="",
+            ),
+        ])
+        assert json.loads(descs.to_llm_images_json()) == [
+            {"timestamp": 10.0, "description": "描述1", "key_elements": ["A"]}
+        ]
+        
+        descs.descriptions[0].description = "描述2"
+        assert json.loads(descs.to_llm_images_json())[0]["description"] == "描述2"
 
 
 class TestDocument:
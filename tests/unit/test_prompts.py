@@ -0,0 +1,75 @@
+"""Unit tests for prompt template loading.
+
+测试 prompt 文件的 frontmatter 解析、默认 system 与按修改时间重新加载。
+"""
+
+import os
+
+import pytest
+
+from video2markdown.config import settings
+from video2markdown.prompts import load_prompt_with_meta
+
+
+class TestLoadPromptWithMeta:
+    """测试 prompt 加载."""
+    
+    def test_frontmatter(self, tmp_path):
+        """解析 system、parameters 与正文."""
+        path = tmp_path / "p.md"
+        path.write_text(
+            "---\nsystem: 你是编辑。\nparameters:\n  temperature: 0.3\n---\n\n正文 {title}\n",
+            encoding="utf-8",
+        )
+        
+        system_msg, template, params = load_prompt_with_meta(path)
+        
+        assert system_msg == "你是编辑。"
+        assert template == "正文 {title}"
+        assert params == {"temperature": 0.3}
+    
+    def test_without_frontmatter(self, tmp_path):
+        """无 frontmatter 时全文为模板，system 使用默认值."""
+        path = tmp_path / "p.md"
+        path.write_text("  正文 --- 分隔  \n", encoding="utf-8")
+        
+        system_msg, template, params = load_prompt_with_meta(path, default_system="默认")
+        
+        assert (system_msg, template, params) == ("默认", "正文 --- 分隔", {})
+    
+    def test_returned_params_are_copies(self, tmp_path):
+        """修改返回的参数不影响缓存."""
+        path = tmp_path / "p.md"
+        path.write_text("---\nparameters:\n  temperature: 1\n---\nbody\n", encoding="utf-8")
+        
+        load_prompt_with_meta(path)[2]["response_format"] = {"type": "json_object"}
+        
+        assert load_prompt_with_meta(path)[2] == {"temperature": 1}
+    
+    def test_reloads_after_modification(self, tmp_path):
+        """文件修改时间变化后重新解析."""
+        path = tmp_path / "p.md"
+        path.write_text("旧", encoding="utf-8")
+        assert load_prompt_with_meta(path)[1] == "旧"
+        
+        path.write_text("新", encoding="utf-8")
+        stat = path.stat()
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+        
+        assert load_prompt_with_meta(path)[1] == "新"
+    
+    def test_unclosed_frontmatter(self, tmp_path):
+        """frontmatter 未闭合时报错."""
+        path = tmp_path / "p.md"
+        path.write_text("---\nsystem: x\nbody\n", encoding="utf-8")
+        
+        with pytest.raises(ValueError, match="未闭合"):
+            load_prompt_with_meta(path)
+    
+    @pytest.mark.parametrize("name", sorted(p.name for p in settings.prompts_dir.glob("*.md")))
+    def test_bundled_prompts_parse(self, name):
+        """仓库自带的 prompt 文件均可解析."""
+        system_msg, template, params = load_prompt_with_meta(settings.prompts_dir / name)
+        
+        assert system_msg and template
+        assert isinstance(params, dict)
@@ -0,0 +1,238 @@
+"""Unit tests for Stage 5 image analysis helpers.
+
+测试多图响应解析、Batch API 结果处理与感知哈希去重。
+"""
+
+from pathlib import Path
+from types import SimpleNamespace
+
+import cv2
+import numpy as np
+import orjson
+import pytest
+
+from video2markdown.models import KeyFrame
+from video2markdown.stage5_analyze_images import (
+    _analyze_via_batch_api, _dhash, _parse_batch_response, _phash
+)
+from video2markdown.stats import get_stats, reset_stats
+
+
+class TestParseBatchResponse:
+    """测试多图分析响应解析."""
+    
+    ITEMS = [
+        {"index": 1, "description": "幻灯片", "key_elements": ["标题"]},
+        {"index": 2, "description": "代码", "key_elements": []},
+    ]
+    
+    def test_plain_array(self):
+        """合法 JSON 数组直接解析."""
+        assert _parse_batch_response(orjson.dumps(self.ITEMS).decode()) == self.ITEMS
+    
+    def test_fenced_with_prose(self):
+        """代码块与前后说明文字被忽略."""
+        content = f"结果如下：\n```json\n{orjson.dumps(self.ITEMS).decode()}\n```\n"
+        
+        assert _parse_batch_response(content) == self.ITEMS
+    
+    def test_sorted_by_index(self):
+        """模型乱序返回时按 index 排序."""
+        content = orjson.dumps(self.ITEMS[::-1]).decode()
+        
+        assert _parse_batch_response(content) == self.ITEMS
+    
+    @pytest.mark.parametrize(
+        "content",
+        [
+            "抱歉，无法分析这些图片。",
+            '[{"index": 1, "description": "截断',
+            '[{"index": 1}, "not an object"]',
+            '[{"index": 1,}, ]x]',
+        ],
+        ids=["no_array", "truncated", "non_object_item", "malformed"],
+    )
+    def test_invalid(self, content):
+        """无法解析为对象数组时抛出 ValueError (调用方逐张重试)."""
+        with pytest.raises(ValueError):
+            _parse_batch_response(content)
+
+
+def _tasks(count: int) -> list[dict]:
+    return [
+        {
+            "frame": KeyFrame(timestamp=float(i), reason="scene_change", source=""),
+            "frame_path": Path(f"frame_{i:04d}.jpg"),
+            "context": f"上下文 {i}",
+        }
+        for i in range(count)
+    ]
+
+
+def _ok_line(custom_id, content: str) -> str:
+    return orjson.dumps({
+        "custom_id": custom_id,
+        "response": {
+            "status_code": 200,
+            "body": {
+                "model": "m",
+                "usage": {"prompt_tokens": 3, "completion_tokens": 2},
+                "choices": [{"message": {"content": content}}],
+            },
+        },
+    }).decode()
+
+
+def _batch_client(output_lines: list[str], status: str = "completed") -> SimpleNamespace:
+    """构造 Batch API 假客户端，输出文件内容为 output_lines."""
+    batch = SimpleNamespace(id="b1", status=status, output_file_id="o1" if output_lines else None)
+    return SimpleNamespace(
+        files=SimpleNamespace(
+            create=lambda file, purpose: SimpleNamespace(id="f1"),
+            content=lambda file_id: SimpleNamespace(text="\n".join(output_lines)),
+        ),
+        batches=SimpleNamespace(
+            create=lambda **kwargs: batch,
+            retrieve=lambda batch_id: batch,
+        ),
+    )
+
+
+@pytest.fixture
+def stats():
+    reset_stats()
+    yield get_stats()
+    reset_stats()
+
+
+class TestAnalyzeViaBatchAPI:
+    """测试 Batch API 结果处理."""
+    
+    URLS = ["https://example.com/a.jpg", "https://example.com/b.jpg", "https://example.com/c.jpg"]
+    
+    def test_all_succeed(self, stats):
+        """结果按 custom_id 放回原位置，并计入用量."""
+        lines = [_ok_line("2", "图三\n- c"), _ok_line("0", "图一\n- a"), _ok_line("1", "图二")]
+        
+        results = _analyze_via_batch_api(_batch_client(lines), _tasks(3), self.URLS)
+        
+        assert [r.description for r in results] == ["图一\n- a", "图二", "图三\n- c"]
+        assert results[0].key_elements == ["a"]
+        assert results[2].timestamp == 2.0
+        assert stats.api_calls == 3
+    
+    def test_partial_failure(self, stats):
+        """失败的请求对应位置为 None."""
+        lines = [
+            _ok_line("0", "图一"),
+            orjson.dumps({"custom_id": "1", "response": {"status_code": 500}}).decode(),
+            orjson.dumps({"custom_id": "2", "response": None, "error": {"code": "x"}}).decode(),
+        ]
+        
+        results = _analyze_via_batch_api(_batch_client(lines), _tasks(3), self.URLS)
+        
+        assert results[0].description == "图一"
+        assert results[1:] == [None, None]
+        assert stats.api_calls == 1
+    
+    def test_malformed_lines_skipped(self, stats, capsys):
+        """格式错误、缺少或越界的 custom_id 只跳过该行."""
+        lines = [
+            "{not json",
+            "",
+            _ok_line(None, "无编号"),
+            orjson.dumps({"response": {"status_code": 200, "body": {}}}).decode(),
+            _ok_line("7", "越界"),
+            _ok_line("x", "非数字"),
+            orjson.dumps({"custom_id": "1", "response": {"status_code": 200, "body": {"choices": []}}}).decode(),
+            _ok_line("2", "图三"),
+        ]
+        
+        results = _analyze_via_batch_api(_batch_client(lines), _tasks(3), self.URLS)
+        
+        assert results[:2] == [None, None]
+        assert results[2].description == "图三"
+        assert stats.api_calls == 1
+        assert capsys.readouterr().out.count("跳过无法解析的 Batch 结果") == 6
+    
+    def test_no_output_file(self, stats):
+        """任务失败且没有输出文件时全部为 None."""
+        results = _analyze_via_batch_api(_batch_client([], status="failed"), _tasks(2), self.URLS[:2])
+        
+        assert results == [None, None]
+
+
+# 建议的去重阈值 (见 VIDEO2MD_DEDUP_HAMMING_THRESHOLD)
+DEDUP_THRESHOLD = 5
+
+
+def _slide(title: str, bars: int) -> np.ndarray:
+    """合成一张幻灯片画面: 标题文字 + 若干横条."""
+    img = np.full((540, 960, 3), 245, dtype=np.uint8)
+    cv2.putText(img, title, (60, 110), cv2.FONT_HERSHEY_SIMPLEX, 2.5, (30, 30, 30), 6)
+    for i in range(bars):
+        cv2.rectangle(img, (80, 180 + i * 70), (880 - i * 120, 220 + i * 70), (200, 90, 40), -1)
+    return img
+
+
+def _distance(image_hash, a: np.ndarray, b: np.ndarray) -> int:
+    return (image_hash(a) ^ image_hash(b)).bit_count()
+
+
+@pytest.fixture(scope="module")
+def slide():
+    return _slide("Architecture", 4)
+
+
+def _jpeg_roundtrip(img: np.ndarray) -> np.ndarray:
+    ok, buf = cv2.imencode(".jpg", img, [cv2.IMWRITE_JPEG_QUALITY, 60])
+    return cv2.imdecode(buf, cv2.IMREAD_COLOR)
+
+
+def _noisy(img: np.ndarray) -> np.ndarray:
+    noise = np.random.default_rng(0).integers(-8, 9, img.shape)
+    return np.clip(img.astype(np.int16) + noise, 0, 255).astype(np.uint8)
+
+
+def _brighter(img: np.ndarray) -> np.ndarray:
+    return cv2.convertScaleAbs(img, alpha=0.9, beta=20)
+
+
+def _resized(img: np.ndarray) -> np.ndarray:
+    return cv2.resize(img, (640, 360), interpolation=cv2.INTER_AREA)
+
+
+@pytest.mark.parametrize("image_hash", [_phash, _dhash], ids=["phash", "dhash"])
+class TestPerceptualHash:
+    """测试感知哈希去重."""
+    
+    def test_is_64_bit_and_deterministic(self, image_hash, slide):
+        """哈希为 64 位整数，相同画面结果一致."""
+        value = image_hash(slide)
+        
+        assert 0 <= value < 1 << 64
+        assert value == image_hash(slide.copy())
+    
+    @pytest.mark.parametrize(
+        "transform",
+        [_jpeg_roundtrip, _noisy, _brighter, _resized],
+        ids=["jpeg", "noise", "brightness", "resize"],
+    )
+    def test_near_duplicates_within_threshold(self, image_hash, slide, transform):
+        """压缩、噪声、亮度或尺寸变化后仍判为重复."""
+        assert _distance(image_hash, slide, transform(slide)) <= DEDUP_THRESHOLD
+    
+    @pytest.mark.parametrize(
+        "other",
+        [
+            lambda: _slide("Conclusion", 1),
+            lambda: np.flipud(_slide("Architecture", 4)).copy(),
+            lambda: cv2.cvtColor(cv2.GaussianBlur(
+                np.random.default_rng(1).integers(0, 256, (540, 960), dtype=np.uint8), (31, 31), 0
+            ), cv2.COLOR_GRAY2BGR),
+        ],
+        ids=["other_slide", "flipped", "texture"],
+    )
+    def test_distinct_frames_beyond_threshold(self, image_hash, slide, other):
+        """不同画面的距离超过阈值，不会被误合并."""
+        assert _distance(image_hash, slide, other()) > DEDUP_THRESHOLD
@@ -0,0 +1,311 @@
+"""Unit tests for Stage 6 document generation helpers.
+
+测试流式章节扫描、模板填充与 AI 响应解析。
+"""
+
+from pathlib import Path
+from types import SimpleNamespace
+
+import orjson
+import pytest
+
+from video2markdown import stage6_generate
+from video2markdown.config import settings
+from video2markdown.models import ImageDescriptions, KeyFrames, TranscriptSegment, VideoTranscript
+from video2markdown.stage6_generate import (
+    _ChapterStreamScanner,
+    _chapter_from_dict,
+    _extract_json_object,
+    _fill_template,
+    _parse_response,
+    _stream_completion,
+    generate_document,
+)
+from video2markdown.stats import get_stats, reset_stats
+
+
+def _chunks(text: str, size: int) -> list[str]:
+    """按固定长度切分文本，模拟流式 delta."""
+    return [text[i:i + size] for i in range(0, len(text), size)]
+
+
+def _feed_all(scanner: _ChapterStreamScanner, chunks: list[str]) -> list[dict]:
+    """依次喂入所有片段，收集完成的章节."""
+    done = []
+    for chunk in chunks:
+        done.extend(scanner.feed(chunk))
+    return done
+
+
+class TestChapterStreamScanner:
+    """测试流式章节扫描."""
+    
+    def test_single_chunk(self):
+        """一次性喂入完整响应."""
+        doc = {"title": "T", "chapters": [{"title": "A"}, {"title": "B"}]}
+        scanner = _ChapterStreamScanner()
+        
+        done = scanner.feed(orjson.dumps(doc).decode())
+        
+        assert done == doc["chapters"]
+        assert scanner.count == 2
+    
+    def test_braces_and_escaped_quotes_in_strings(self):
+        """字符串中的括号与转义引号不影响深度计算."""
+        chapters = [
+            {"title": 'say "}" and {', "summary": "a\\\"b ] [ }}"},
+            {"title": "路径 C:\\\\dir\\\\", "key_points": ["{x}", "\"]"]},
+        ]
+        text = orjson.dumps({"title": "T", "chapters": chapters}).decode()
+        scanner = _ChapterStreamScanner()
+        
+        assert scanner.feed(text) == chapters
+    
+    @pytest.mark.parametrize("size", [1, 2, 3, 7, 16])
+    def test_chapter_split_across_chunks(self, size):
+        """章节对象跨多个 chunk 时仍能完整拼出 (含转义符被切断的情况)."""
+        chapters = [
+            {"title": "第一章", "summary": 'quote \\" brace }', "start_time": "00:00:00"},
+            {"title": "第二章", "key_points": ["a", "b"]},
+        ]
+        text = orjson.dumps({"title": "T", "chapters": chapters}).decode()
+        scanner = _ChapterStreamScanner()
+        
+        assert _feed_all(scanner, _chunks(text, size)) == chapters
+        assert scanner.count == 2
+    
+    def test_nested_objects_and_arrays(self):
+        """章节内嵌套的对象与数组不会提前结束章节."""
+        chapters = [
+            {"title": "A", "meta": {"tags": [{"k": 1}, [2, [3]]], "x": {}}},
+            {"title": "B", "key_points": [[], {"y": []}]},
+        ]
+        text = orjson.dumps({"title": "T", "chapters": chapters}, option=orjson.OPT_INDENT_2).decode()
+        scanner = _ChapterStreamScanner()
+        
+        assert _feed_all(scanner, _chunks(text, 5)) == chapters
+    
+    def test_incomplete_chapter_not_emitted(self):
+        """未闭合的章节不输出，闭合后才输出."""
+        scanner = _ChapterStreamScanner()
+        
+        assert scanner.feed('{"title": "T", "chapters": [{"title": "A", "x": [1') == []
+        assert scanner.count == 0
+        assert scanner.feed(", 2]}]}") == [{"title": "A", "x": [1, 2]}]
+    
+    def test_top_level_fields_ignored(self):
+        """顶层字段中的对象 (深度 2) 不当作章节."""
+        text = '{"meta": {"a": 1, "b": [2]}, "title": "T", "chapters": [{"title": "A"}]}'
+        scanner = _ChapterStreamScanner()
+        
+        assert scanner.feed(text) == [{"title": "A"}]
+
+
+def _fake_client(text: str, usage=None) -> SimpleNamespace:
+    """构造返回流式 chunk 的假客户端，usage 非空时附加用量 chunk."""
+    def create(**kwargs):
+        chunks = [
+            SimpleNamespace(usage=None, choices=[SimpleNamespace(delta=SimpleNamespace(content=part))])
+            for part in _chunks(text, 4)
+        ]
+        if usage is not None:
+            chunks.append(SimpleNamespace(usage=usage, choices=[]))
+        return iter(chunks)
+    
+    return SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+
+
+class TestStreamCompletion:
+    """测试流式调用."""
+    
+    TEXT = '{"title": "T", "chapters": [{"title": "A"}]}'
+    
+    def test_returns_text_and_usage(self, capsys):
+        """拼接完整响应并返回用量 chunk."""
+        usage = SimpleNamespace(prompt_tokens=10, completion_tokens=5, total_tokens=15)
+        
+        content, usage_chunk = _stream_completion(_fake_client(self.TEXT, usage), [], {})
+        
+        assert content == self.TEXT
+        assert usage_chunk.usage is usage
+        assert "未返回 Token 用量" not in capsys.readouterr().out
+    
+    def test_warns_without_usage(self, capsys):
+        """服务商忽略 include_usage 时给出警告."""
+        content, usage_chunk = _stream_completion(_fake_client(self.TEXT), [], {})
+        
+        assert content == self.TEXT
+        assert usage_chunk is None
+        assert "未返回 Token 用量" in capsys.readouterr().out
+
+
+DOC = {"title": "T", "chapters": [{"title": "A", "summary": "含 {括号} 与 \"引号\""}]}
+DOC_JSON = orjson.dumps(DOC).decode()
+
+
+class TestParseResponse:
+    """测试 AI 响应解析."""
+    
+    def test_plain_json(self):
+        """合法 JSON 直接解析."""
+        assert _parse_response(DOC_JSON) == DOC
+    
+    @pytest.mark.parametrize(
+        "content",
+        [
+            f"```json\n{DOC_JSON}\n```",
+            f"```\n{DOC_JSON}\n```",
+            f"下面是结果：\n```json\n{DOC_JSON}\n```\n以上。",
+            f"```json\n{DOC_JSON}",  # 代码块未闭合
+        ],
+        ids=["json_fence", "bare_fence", "fence_with_prose", "unclosed_fence"],
+    )
+    def test_fenced(self, content):
+        """去除 markdown 代码块."""
+        assert _parse_response(content) == DOC
+    
+    def test_prose_around_json(self):
+        """JSON 前后有说明文字."""
+        content = f"好的，文档如下：\n{DOC_JSON}\n如需调整请告诉我 {{}}。"
+        
+        assert _parse_response(content) == DOC
+    
+    def test_truncated_json(self):
+        """输出被截断时尽量修复出已完成的部分."""
+        content = '{"title": "T", "chapters": [{"title": "A"}, {"title": "B", "summ'
+        
+        doc = _parse_response(content)
+        
+        assert doc["title"] == "T"
+        assert doc["chapters"][0] == {"title": "A"}
+    
+    def test_trailing_comma(self):
+        """尾随逗号等常见格式错误."""
+        content = '{"title": "T", "chapters": [{"title": "A",},],}'
+        
+        assert _parse_response(content) == {"title": "T", "chapters": [{"title": "A"}]}
+    
+    def test_invalid_json_falls_back(self, tmp_path, monkeypatch):
+        """完全无法解析时返回默认结构并保存原始响应."""
+        monkeypatch.chdir(tmp_path)
+        
+        doc = _parse_response("抱歉，我无法完成这个请求。")
+        
+        assert doc == {"title": "解析失败 - 使用默认结构", "chapters": []}
+        assert list((tmp_path / "test_outputs" / "temp").glob("stage6_debug_*.txt.gz"))
+
+
+class TestExtractJsonObject:
+    """测试第一个完整 JSON 对象的提取."""
+    
+    def test_with_prose(self):
+        """忽略前后文字，字符串中的括号不参与配对."""
+        assert _extract_json_object(f"前言 {DOC_JSON} 后记 {{}}") == DOC_JSON
+    
+    def test_first_object_only(self):
+        """多个对象时只取第一个."""
+        assert _extract_json_object('{"a": {"b": 1}} {"c": 2}') == '{"a": {"b": 1}}'
+    
+    @pytest.mark.parametrize("text", ["no json here", '{"a": {"b": 1}', '{"a": "}'])
+    def test_incomplete(self, text):
+        """没有对象或对象未闭合时返回 None."""
+        assert _extract_json_object(text) is None
+
+
+class TestFillTemplate:
+    """测试模板填充."""
+    
+    def test_substitutes_variables(self):
+        """替换 {name} 变量."""
+        assert _fill_template("# {title}\n{m1_text}", title="T", m1_text="正文") == "# T\n正文"
+    
+    def test_literal_braces(self):
+        """{{ 与 }} 还原为字面括号，不当作变量."""
+        template = '输出格式: {{"title": "{title}", "chapters": [{{}}]}}'
+        
+        assert _fill_template(template, title="T") == '输出格式: {"title": "T", "chapters": [{}]}'
+    
+    def test_escaped_variable_name(self):
+        """{{name}} 保留为字面 {name}."""
+        assert _fill_template("{{title}} {title}", title="T") == "{title} T"
+    
+    def test_missing_key_kept(self):
+        """未提供的变量保持原样."""
+        assert _fill_template("{title} {unknown}", title="T") == "T {unknown}"
+    
+    def test_values_not_reparsed(self):
+        """替换值中的括号不会被再次解析."""
+        result = _fill_template("{images}", images='[{"t": 1}] {title} {{x}}', title="T")
+        
+        assert result == '[{"t": 1}] {title} {{x}}'
+    
+    def test_non_identifier_braces_untouched(self):
+        """非变量形式的单个括号原样保留."""
+        assert _fill_template("a {b c} {} }", b="x") == "a {b c} {} }"
+
+
+class TestChapterFromDict:
+    """测试由响应构造章节."""
+    
+    def test_defaults(self):
+        """缺失字段使用默认值，缺失标题按序号命名."""
+        chapter = _chapter_from_dict(2, {})
+        
+        assert chapter.id == 2
+        assert chapter.title == "章节 2"
+        assert chapter.start_time == "00:00:00"
+        assert chapter.key_points == []
+        assert chapter.visual_timestamp is None
+    
+    def test_empty_title_kept(self):
+        """显式给出的空标题原样保留，只有缺失时才回退."""
+        assert _chapter_from_dict(1, {"title": ""}).title == ""
+    
+    def test_key_points_copied(self):
+        """列表要点复制为新列表."""
+        points = ["a", "b"]
+        chapter = _chapter_from_dict(1, {"key_points": points})
+        
+        assert chapter.key_points == points
+        assert chapter.key_points is not points
+    
+    @pytest.mark.parametrize(
+        "value,expected",
+        [(None, []), ("单条要点", ["单条要点"]), ("", []), (3, [])],
+        ids=["null", "string", "empty_string", "number"],
+    )
+    def test_key_points_non_list(self, value, expected):
+        """null 不报错，字符串不会被拆成单字."""
+        assert _chapter_from_dict(1, {"key_points": value}).key_points == expected
+
+
+class TestGenerateDocumentCache:
+    """测试文档生成的响应缓存."""
+    
+    def test_cache_hit_recorded_as_zero_tokens(self, tmp_path, monkeypatch):
+        """重跑命中缓存时不调用 API，但仍以 0 token 计入用量统计."""
+        monkeypatch.setattr(settings, "llm_cache", True)
+        monkeypatch.setattr(settings, "temp_dir", tmp_path)
+        usage = SimpleNamespace(prompt_tokens=100, completion_tokens=50, total_tokens=150)
+        calls = []
+        client = _fake_client('{"title": "T", "chapters": [{"title": "A"}]}', usage)
+        create = client.chat.completions.create
+        client.chat.completions.create = lambda **kwargs: calls.append(kwargs) or create(**kwargs)
+        monkeypatch.setattr(stage6_generate, "get_client", lambda **kwargs: client)
+        transcript = VideoTranscript(
+            Path("v.mp4"), "v", "zh", [TranscriptSegment(0.0, 5.0, "你好")], "优化文稿"
+        )
+        reset_stats()
+        
+        try:
+            docs = [
+                generate_document(transcript, KeyFrames(Path("v.mp4"), []), ImageDescriptions([]))
+                for _ in range(2)
+            ]
+            records = [(r.stage, r.prompt_tokens, r.completion_tokens) for r in get_stats().records]
+        finally:
+            reset_stats()
+        
+        assert len(calls) == 1
+        assert docs[0].chapters == docs[1].chapters
+        assert records == [("stage6_generate", 100, 50), ("stage6_generate", 0, 0)]
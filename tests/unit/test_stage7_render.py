@@ -0,0 +1,94 @@
+"""Unit tests for Stage 7 frame placement.
+
+测试配图放入成果目录的各模式及其回退复制。
+"""
+
+import errno
+import os
+
+import pytest
+
+from video2markdown.config import Settings
+from video2markdown.stage7_render import _place_frame
+
+
+@pytest.fixture
+def frame(tmp_path):
+    """临时目录中的原图."""
+    src = tmp_path / "temp" / "frame_0001.jpg"
+    src.parent.mkdir()
+    src.write_bytes(b"\xff\xd8jpeg-data")
+    dest_dir = tmp_path / "images"
+    dest_dir.mkdir()
+    return src, dest_dir / src.name
+
+
+def _raise_exdev(*args, **kwargs):
+    raise OSError(errno.EXDEV, "Invalid cross-device link")
+
+
+class TestPlaceFrame:
+    """测试配图放置."""
+    
+    def test_default_mode_is_copy(self):
+        """默认复制，成果目录不与临时目录共用文件."""
+        assert Settings.model_fields["stage7_frame_mode"].default == "copy"
+    
+    def test_copy(self, frame):
+        """复制后两处为独立文件."""
+        src, dest = frame
+        
+        _place_frame(src, dest, "copy")
+        
+        assert dest.read_bytes() == src.read_bytes()
+        assert not os.path.samefile(src, dest)
+    
+    def test_link(self, frame):
+        """硬链接后两处为同一文件."""
+        src, dest = frame
+        
+        _place_frame(src, dest, "link")
+        
+        assert os.path.samefile(src, dest)
+    
+    def test_link_replaces_existing(self, frame):
+        """目标已存在 (重跑) 时替换为硬链接."""
+        src, dest = frame
+        dest.write_bytes(b"stale")
+        
+        _place_frame(src, dest, "link")
+        
+        assert os.path.samefile(src, dest)
+    
+    def test_reflink(self, frame):
+        """reflink (或不支持时的回退复制) 得到独立的同内容文件."""
+        src, dest = frame
+        
+        _place_frame(src, dest, "reflink")
+        
+        assert dest.read_bytes() == src.read_bytes()
+        assert not os.path.samefile(src, dest)
+    
+    def test_move(self, frame):
+        """移动后原图不再保留."""
+        src, dest = frame
+        data = src.read_bytes()
+        
+        _place_frame(src, dest, "move")
+        
+        assert dest.read_bytes() == data
+        assert not src.exists()
+    
+    @pytest.mark.parametrize(
+        "mode,func",
+        [("link", "link"), ("move", "replace"), ("reflink", "copy_file_range")],
+    )
+    def test_cross_device_falls_back_to_copy(self, frame, monkeypatch, mode, func):
+        """跨设备 (EXDEV) 时回退为复制，原图保留."""
+        src, dest = frame
+        monkeypatch.setattr(os, func, _raise_exdev)
+        
+        _place_frame(src, dest, mode)
+        
+        assert dest.read_bytes() == src.read_bytes()
+        assert not os.path.samefile(src, dest)
@@ -0,0 +1,78 @@
+"""Unit tests for API usage statistics.
+
+测试用量统计的累加与序列化快照。
+"""
+
+import pytest
+
+from video2markdown.config import settings
+from video2markdown.stats import APICallRecord, UsageStats
+
+
+class TestUsageStats:
+    """测试 UsageStats."""
+    
+    def test_add(self):
+        """累加 token 与调用次数，并记录明细."""
+        stats = UsageStats()
+        stats.add(100, 20, stage="stage2", model="m")
+        stats.add(50, 10, stage="stage5", model="m")
+        
+        assert (stats.prompt_tokens, stats.completion_tokens, stats.api_calls) == (150, 30, 2)
+        assert [r.stage for r in stats.records] == ["stage2", "stage5"]
+    
+    def test_to_dict_records_are_snapshot(self):
+        """to_dict() 返回的明细是副本，不随之后的 add() 变化."""
+        stats = UsageStats()
+        stats.add(100, 20, stage="stage2")
+        
+        data = stats.to_dict()
+        stats.add(50, 10, stage="stage5")
+        
+        assert [r["stage"] for r in data["records"]] == ["stage2"]
+        assert data["total"]["api_calls"] == 1
+        assert len(stats.to_dict()["records"]) == 2
+    
+    def test_to_dict_copy_does_not_alias(self):
+        """修改返回的明细列表不影响统计本身."""
+        stats = UsageStats()
+        stats.add(100, 20)
+        
+        stats.to_dict()["records"].clear()
+        
+        assert len(stats.to_dict()["records"]) == 1
+    
+    def test_records_passed_to_init_are_serialized(self):
+        """构造时传入的明细同样出现在 to_dict() 中."""
+        record = APICallRecord(
+            stage="stage6", timestamp="2026-01-01T00:00:00",
+            prompt_tokens=10, completion_tokens=5, model="m",
+        )
+        stats = UsageStats(records=[record])
+        stats.add(1, 1, stage="stage7")
+        
+        assert [r["stage"] for r in stats.to_dict()["records"]] == ["stage6", "stage7"]
+    
+    def test_lock_is_not_init_arg(self):
+        """锁由实例自行创建，不能从外部传入."""
+        with pytest.raises(TypeError):
+            UsageStats(_lock=None)
+    
+    def test_reported_prices_match_costs(self, monkeypatch):
+        """价格配置变化后未 refresh_prices() 时，报告的单价与费用仍一致."""
+        monkeypatch.setattr(settings, "llm_price_input_per_1m", 4.0)
+        monkeypatch.setattr(settings, "llm_price_output_per_1m", 16.0)
+        stats = UsageStats()
+        stats.add(1_000_000, 1_000_000)
+        
+        monkeypatch.setattr(settings, "llm_price_input_per_1m", 100.0)
+        data = stats.to_dict()
+        
+        assert data["pricing"]["input_price_per_1m"] == 4.0
+        assert data["total"]["input_cost"] == 4.0
+        assert "- 输入: ¥4.0 / 百万 tokens" in stats.generate_summary_md()
+        
+        stats.refresh_prices()
+        
+        assert stats.to_dict()["pricing"]["input_price_per_1m"] == 100.0
+        assert stats.input_cost == 100.0